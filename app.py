@@ -1,1179 +1,1446 @@
-import streamlit as st
-from streamlit_js_eval import streamlit_js_eval
-import pandas as pd
-import json
-import os
-from PIL import Image
-from datetime import datetime
-import google.generativeai as genai
-
-# --- CONFIGURATION ---
-DB_FILE = "balloon_inventory.json"
-SETTINGS_FILE = "settings.json"
-
-LATEX_SIZES = ["5in", "11in", "17in", "24in", "32in"]
-DEFAULT_THRESHOLDS = {
-    "5in": {"low": 2, "medium": 5},
-    "11in": {"low": 2, "medium": 5},
-    "17in": {"low": 1, "medium": 3},
-    "24in": {"low": 1, "medium": 2},
-    "32in": {"low": 1, "medium": 2},
-}
-
-# --- 1. BACKEND FUNCTIONS ---
-
-def load_settings():
-    """Loads thresholds from JSON file or creates it with defaults."""
-    if not os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(DEFAULT_THRESHOLDS, f)
-        return DEFAULT_THRESHOLDS
-    
-    with open(SETTINGS_FILE, 'r') as f:
-        return json.load(f)
-
-def save_settings(settings_data):
-    """Saves the thresholds back to JSON."""
-    with open(SETTINGS_FILE, 'w') as f:
-        json.dump(settings_data, f)
-
-def load_data():
-    """Loads inventory and handles migration for new fields (Foils, Usage, Barcodes, Open Bags)."""
-    if not os.path.exists(DB_FILE):
-        # Initial dummy data
-        initial_data = [
-            # Latex Examples
-            {"id": 1, "category": "latex", "brand": "Tuftex", "color": "Burnt Orange", "hex": "#CC5500", "5in": {"full": 2, "open": 0}, "11in": {"full": 5, "open": 0}, "17in": {"full": 1, "open": 0}, "24in": {"full": 0, "open": 0}, "32in": {"full": 0, "open": 0}, "barcodes": {}, "monthly_usage": {}},
-            {"id": 2, "category": "latex", "brand": "Sempertex", "color": "White Sand", "hex": "#E8E3D9", "5in": {"full": 10, "open": 0}, "11in": {"full": 8, "open": 0}, "17in": {"full": 4, "open": 0}, "24in": {"full": 2, "open": 0}, "32in": {"full": 1, "open": 0}, "barcodes": {}, "monthly_usage": {"2025-02": 5}},
-            # Foil Examples
-            {"id": 3, "category": "foil", "foil_type": "Number", "design": "1", "color": "Gold", "hex": "#D4AF37", "small": {"full": 2, "open": 0}, "large": {"full": 4, "open": 0}, "barcodes": {}, "monthly_usage": {"2026-01": 1}},
-            {"id": 4, "category": "foil", "foil_type": "Shape", "design": "Dinosaur", "color": "Green", "hex": "#228B22", "small": {"full": 0, "open": 0}, "large": {"full": 2, "open": 0}, "barcodes": {}, "monthly_usage": {}},
-        ]
-        with open(DB_FILE, 'w') as f:
-            json.dump(initial_data, f)
-    
-    with open(DB_FILE, 'r') as f:
-        try:
-            data = json.load(f)
-        except:
-            return pd.DataFrame()
-            
-    # --- MIGRATION: UPGRADE OLD DATA TO SUPPORT FOILS, USAGE, BARCODES & OPEN BAGS ---
-    if data and isinstance(data, list) and len(data) > 0:
-        needs_save = False
-        current_month_str = datetime.now().strftime("%Y-%m")
-        for entry in data:
-            # 1. Add Category if missing (assume Latex)
-            if "category" not in entry:
-                entry["category"] = "latex"
-                needs_save = True
-            
-            # 2. Add Foil Fields if missing
-            if "foil_type" not in entry:
-                entry["foil_type"] = "" # Number, Letter, Shape
-                entry["design"] = ""    # "1", "A", "Star"
-                entry["small"] = 0      # Will migrate to dict below
-                entry["large"] = 0      
-                needs_save = True
-            
-            # 3. Add 32in size if missing
-            if "32in" not in entry:
-                entry["32in"] = 0
-                needs_save = True
-            
-            # 4. Migrate from 'usage' to 'monthly_usage'
-            if "monthly_usage" not in entry:
-                needs_save = True
-                usage_val = entry.get("usage", 0)
-                entry["monthly_usage"] = {}
-                if usage_val > 0:
-                    entry["monthly_usage"][current_month_str] = usage_val
-                if "usage" in entry:
-                    del entry["usage"]
-                    
-            # 5. Add barcodes dictionary mapping size -> list of barcodes
-            if "barcodes" not in entry:
-                needs_save = True
-                entry["barcodes"] = {}
-                
-            # 6. Migrate sizes from ints to dicts {"full": X, "open": Y}
-            sizes_to_check = LATEX_SIZES if entry["category"] == "latex" else ["small", "large"]
-            for size in sizes_to_check:
-                if size in entry and isinstance(entry[size], int):
-                    needs_save = True
-                    val = entry[size]
-                    entry[size] = {"full": val, "open": 0}
-                elif size not in entry:
-                    needs_save = True
-                    entry[size] = {"full": 0, "open": 0}
-                
-        if needs_save:
-            with open(DB_FILE, 'w') as f:
-                json.dump(data, f)
-            
-    return pd.DataFrame(data)
-
-def save_data(df):
-    data = df.to_dict(orient="records")
-    with open(DB_FILE, 'w') as f:
-        json.dump(data, f)
-
-def analyze_image_with_gemini(image):
-    # Check for the API key in Streamlit secrets
-    if "API_KEY" not in st.secrets or not st.secrets["API_KEY"]:
-        st.error("Gemini API Key not found. Please add it to your Streamlit secrets.")
-        st.info("You can get a free API key from Google AI Studio and add it to the secrets of this app.")
-        return []
-        
-    genai.configure(api_key=st.secrets["API_KEY"])
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    
-    # Updated prompt to handle Foils
-    prompt = """
-    Analyze this image of balloon packaging. 
-    1. Determine if it is LATEX (standard round) or FOIL (mylar shapes/numbers).
-    2. Extract Brand, Color.
-    3. If FOIL: Extract the Shape/Design (e.g., "Number 1", "Letter A", "Star") and Type (Number/Letter/Shape).
-    4. If LATEX: Extract Size (5in, 11in, etc).
-
-    Return JSON list. Examples:
-    [{"category": "latex", "brand": "Tuftex", "color": "Cocoa", "size": "11in"}]
-    [{"category": "foil", "brand": "Northstar", "color": "Gold", "foil_type": "Number", "design": "1", "size": "large"}]
-    """
-    
-    with st.spinner('🤖 AI is scanning...'):
-        try:
-            response = model.generate_content([prompt, image])
-            text = response.text.strip()
-            if text.startswith("```json"): text = text[7:-3]
-            elif text.startswith("```"): text = text[3:-3]
-            return json.loads(text)
-        except Exception as e:
-            st.error(f"AI Error: {e}")
-            return []
-
-# --- 2. FRONTEND UI ---
-
-st.set_page_config(page_title="PopStock", page_icon="🎈", layout="wide")
-
-# --- AUTHENTICATION ---
-def check_password():
-    """Returns `True` if the user had the correct password."""
-
-    def password_entered():
-        """Checks whether a password entered by the user is correct."""
-        if "APP_PASSWORD" in st.secrets:
-            if st.session_state.get("password", "") == st.secrets["APP_PASSWORD"]:
-                st.session_state["password_correct"] = True
-                if "password" in st.session_state:
-                    del st.session_state["password"]  # don't store password
-            else:
-                st.session_state["password_correct"] = False
-        else:
-            # If no password is set in secrets, allow access (or you could choose to block)
-            st.warning("No 'APP_PASSWORD' found in Streamlit secrets. App is open to public.")
-            st.session_state["password_correct"] = True
-
-    def render_login_ui(show_error=False):
-        st.markdown(
-            """
-            <style>
-            /* Make the password input look like a PIN pad */
-            div[data-baseweb="input"] input[type="password"] {
-                text-align: center !important;
-                font-size: 2rem !important;
-                letter-spacing: 0.5em !important;
-                padding: 10px !important;
-            }
-            /* Hide the password reveal toggle to keep it clean */
-            div[data-baseweb="input"] button {
-                display: none !important;
-            }
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
-        st.markdown("<h1 style='text-align: center; margin-top: 10vh;'>🎈 PopStock</h1>", unsafe_allow_html=True)
-        st.markdown("<h4 style='text-align: center; color: #888; font-weight: normal;'>Enter PIN to unlock</h4>", unsafe_allow_html=True)
-        
-        _, col, _ = st.columns([1, 2, 1])
-        with col:
-            st.text_input(
-                "PIN", 
-                type="password", 
-                on_change=password_entered, 
-                key="password", 
-                label_visibility="collapsed",
-                placeholder="••••"
-            )
-            
-            import streamlit.components.v1 as components
-            components.html(
-                """
-                <script>
-                // We use an interval to keep checking until Streamlit renders the input field
-                const interval = setInterval(() => {
-                    const pinInput = window.parent.document.querySelector('div[data-baseweb="input"] input[type="password"]');
-                    if (pinInput) {
-                        pinInput.setAttribute('inputmode', 'numeric');
-                        pinInput.setAttribute('pattern', '[0-9]*');
-                        clearInterval(interval);
-                    }
-                }, 100);
-                </script>
-                """,
-                height=0,
-                width=0
-            )
-            
-            if show_error:
-                st.error("😕 PIN incorrect")
-
-    if "password_correct" not in st.session_state:
-        # First run, show input for password.
-        render_login_ui(show_error=False)
-        return False
-    elif not st.session_state["password_correct"]:
-        # Password not correct, show input + error.
-        render_login_ui(show_error=True)
-        return False
-    else:
-        # Password correct.
-        return True
-
-if not check_password():
-    st.stop()  # Do not continue if check_password is not True.
-
-# Sidebar
-st.sidebar.title("🎈 PopStock")
-page = st.sidebar.radio("Go to", ["Inventory", "Scanner Hub", "Scan Shipment", "Add Manually", "Analytics", "Settings"])
-st.sidebar.markdown("---")
-
-# Auto-detect screen width to set view mode
-screen_width = streamlit_js_eval(js_expressions='window.innerWidth', key='SCR_WIDTH')
-
-# Default to Desktop if width is unknown (first load), otherwise use 768px threshold
-if screen_width is None or screen_width > 768:
-    view_mode = "💻 Desktop"
-else:
-    view_mode = "📱 Mobile"
-
-# For debugging or manual override, we can hide this or keep it disabled
-st.sidebar.markdown(f"*Auto-detected view: {view_mode}*")
-st.sidebar.markdown("---")
-st.sidebar.markdown("🛒 **[Open Supplier Site](https://bargainballoons.com)**")
-
-latex_thresholds = load_settings()
-df = load_data()
-
-# --- PAGE: INVENTORY ---
-if page == "Inventory":
-    st.title("Current Inventory")
-    
-    if view_mode == "📱 Mobile":
-        st.markdown("""
-        <style>
-        /* 1. Target EXACTLY the stVerticalBlock container of the card, preventing bleeding to parent tabs */
-        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) {
-            position: relative !important;
-        }
-        /* 2. Float the entire layout wrapper containing the popover to top right */
-        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) > div[data-testid="stLayoutWrapper"]:has(div[data-testid="stPopover"]) {
-            position: absolute !important;
-            top: 10px !important;
-            right: 10px !important;
-            width: auto !important;
-            z-index: 10;
-        }
-        /* 3. Make the popover button a compact circle */
-        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button {
-            padding: 0 !important;
-            width: 38px !important;
-            height: 38px !important;
-            min-height: 0 !important;
-            border-radius: 50% !important;
-            line-height: 1 !important;
-            display: flex !important;
-            align-items: center !important;
-            justify-content: center !important;
-        }
-        /* 4. Hide the chevron icon container so the gear fits perfectly */
-        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button > div > div:last-child {
-            display: none !important;
-        }
-        /* 5. Force the inner button container and markdown to be perfectly centered */
-        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button > div > div:first-child {
-            display: flex !important;
-            align-items: center !important;
-            justify-content: center !important;
-            width: 100% !important;
-            height: 100% !important;
-        }
-        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button div[data-testid="stMarkdownContainer"] {
-            display: flex !important;
-            align-items: center !important;
-            justify-content: center !important;
-            width: 100% !important;
-            height: 100% !important;
-            margin: 0 !important;
-            padding: 0 !important;
-        }
-        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button p {
-            margin: 0 !important;
-            padding: 0 !important;
-            font-size: 1.2em !important;
-            display: flex !important;
-            align-items: center !important;
-            justify-content: center !important;
-        }
-        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button span {
-            margin: 0 !important;
-            padding: 0 !important;
-        }
-        /* Safely force table row columns to stay side-by-side on mobile without stacking */
-        div[data-testid="stHorizontalBlock"]:has(.mobile-table-row) {
-            display: flex !important;
-            flex-direction: row !important;
-            flex-wrap: nowrap !important;
-            align-items: center !important;
-            width: 100% !important;
-            gap: 5px !important;
-        }
-        div[data-testid="stHorizontalBlock"]:has(.mobile-table-row) > div[data-testid="stColumn"]:nth-child(1) {
-            flex: 1.5 1 0% !important;
-            width: auto !important;
-            min-width: 0 !important;
-        }
-        div[data-testid="stHorizontalBlock"]:has(.mobile-table-row) > div[data-testid="stColumn"]:nth-child(2) {
-            flex: 2 1 0% !important;
-            width: auto !important;
-            min-width: 0 !important;
-        }
-        div[data-testid="stHorizontalBlock"]:has(.mobile-table-row) > div[data-testid="stColumn"]:nth-child(3) {
-            flex: 2 1 0% !important;
-            width: auto !important;
-            min-width: 0 !important;
-        }
-        /* Make number inputs more compact */
-        input[type="number"] {
-            text-align: center !important;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        
-    # TABS for Latex vs Foil
-    tab_latex, tab_foil = st.tabs(["🔵 Latex Balloons", "✨ Foil Balloons"])
-    
-    # --- TAB 1: LATEX ---
-    with tab_latex:
-        # Filter for Latex
-        latex_df = df[df['category'] == 'latex'].copy()
-        
-        # Search Latex
-        search = st.text_input("🔍 Search Latex (Color)", "", key="search_latex")
-        if search:
-            latex_df = latex_df[latex_df['color'].str.contains(search, case=False) | latex_df['brand'].str.contains(search, case=False)]
-
-        for index, row in latex_df.iterrows():
-            if view_mode == "💻 Desktop":
-                with st.container():
-                    st.markdown(f"### {row['brand']} - {row['color']}")
-                    c1, c2 = st.columns([1, 6])
-                    with c1:
-                        st.markdown(f'<div style="background-color:{row["hex"]}; width:60px; height:60px; border-radius:50%; border: 2px solid #ddd;"></div>', unsafe_allow_html=True)
-                    with c2:
-                        cols = st.columns(len(LATEX_SIZES))
-                        for i, size in enumerate(LATEX_SIZES):
-                            qty_dict = row[size]
-                            full_qty = qty_dict.get('full', 0)
-                            open_qty = qty_dict.get('open', 0)
-                            
-                            thresholds = latex_thresholds[size]
-                            if full_qty <= thresholds["low"]:
-                                color_alert = "red"
-                            elif full_qty <= thresholds["medium"]:
-                                color_alert = "orange"
-                            else:
-                                color_alert = "green"
-
-                            cols[i].markdown(f"**{size}**")
-                            cols[i].markdown(f":{color_alert}[**{full_qty} Full**] | **{open_qty} Open**")
-                            
-                            btn_full_c1, btn_full_c2 = cols[i].columns(2)
-                            if btn_full_c1.button("➖ Full", key=f"d_l_f_sub_{row['id']}_{size}", help="Remove a full bag"):
-                                if full_qty > 0:
-                                    df.at[index, size]['full'] = full_qty - 1
-                                    current_month_str = datetime.now().strftime("%Y-%m")
-                                    usage_dict = df.at[index, 'monthly_usage']
-                                    usage_dict[current_month_str] = usage_dict.get(current_month_str, 0) + 1
-                                    save_data(df)
-                                    st.rerun()
-                            if btn_full_c2.button("➕ Full", key=f"d_l_f_add_{row['id']}_{size}", help="Add a full bag"):
-                                df.at[index, size]['full'] = full_qty + 1
-                                save_data(df)
-                                st.rerun()
-                                
-                            btn_open_c1, btn_open_c2 = cols[i].columns(2)
-                            if btn_open_c1.button("➖ Open", key=f"d_l_o_sub_{row['id']}_{size}", help="Trash an empty open bag"):
-                                if open_qty > 0:
-                                    df.at[index, size]['open'] = open_qty - 1
-                                    save_data(df)
-                                    st.rerun()
-                            if btn_open_c2.button("➕ Open", key=f"d_l_o_add_{row['id']}_{size}", help="Open a full bag"):
-                                if full_qty > 0:
-                                    df.at[index, size]['full'] = full_qty - 1
-                                    df.at[index, size]['open'] = open_qty + 1
-                                    save_data(df)
-                                    st.rerun()
-                    
-                    with st.popover("⚙️ Edit / Delete"):
-                        st.markdown(f"**Edit {row['brand']} - {row['color']}**")
-                        new_brand = st.text_input("Brand", value=row['brand'], key=f"d_edit_brand_l_{row['id']}")
-                        new_color = st.text_input("Color Name", value=row['color'], key=f"d_edit_color_l_{row['id']}")
-                        new_hex = st.color_picker("Color Match", value=row['hex'], key=f"d_edit_hex_l_{row['id']}")
-                        
-                        if st.button("Save Changes", key=f"d_save_l_{row['id']}"):
-                            df.at[index, 'brand'] = new_brand
-                            df.at[index, 'color'] = new_color
-                            df.at[index, 'hex'] = new_hex
-                            save_data(df)
-                            st.rerun()
-                        
-                        st.divider()
-                        if st.checkbox("Confirm Delete", key=f"d_confirm_delete_l_{row['id']}"):
-                            if st.button("❌ Delete Permanently", type="primary", key=f"d_delete_l_{row['id']}"):
-                                df.drop(index, inplace=True)
-                                save_data(df)
-                                st.rerun()
-
-                    st.divider()
-            else: # Mobile
-                with st.container(border=True):
-                    st.markdown(
-                        f"""
-                        <div class="header-row-marker" style="display: flex; align-items: center; gap: 10px; margin-top: 5px; padding-right: 40px;">
-                            <div style="background-color:{row['hex']}; width:35px; height:35px; border-radius:50%; border: 1px solid #ddd; flex-shrink: 0;"></div>
-                            <div style="line-height: 1.2;">
-                                <strong>{row['brand']}</strong><br/>
-                                <span style="font-size: 0.9em;">{row['color']}</span>
-                            </div>
-                        </div>
-                        """, 
-                        unsafe_allow_html=True
-                    )
-                    
-                    with st.popover("⚙️"):
-                        st.markdown(f"**Edit {row['brand']} - {row['color']}**")
-                        new_brand = st.text_input("Brand", value=row['brand'], key=f"m_edit_brand_l_{row['id']}")
-                        new_color = st.text_input("Color Name", value=row['color'], key=f"m_edit_color_l_{row['id']}")
-                        new_hex = st.color_picker("Color Match", value=row['hex'], key=f"m_edit_hex_l_{row['id']}")
-                        
-                        if st.button("Save Changes", key=f"m_save_l_{row['id']}", use_container_width=True):
-                            df.at[index, 'brand'] = new_brand
-                            df.at[index, 'color'] = new_color
-                            df.at[index, 'hex'] = new_hex
-                            save_data(df)
-                            st.rerun()
-                        
-                        st.divider()
-                        if st.checkbox("Confirm Delete", key=f"m_confirm_delete_l_{row['id']}"):
-                            if st.button("❌ Delete Permanently", type="primary", key=f"m_delete_l_{row['id']}", use_container_width=True):
-                                df.drop(index, inplace=True)
-                                save_data(df)
-                                st.rerun()
-
-                    st.markdown("<hr style='margin: 10px 0; border: none; border-top: 1px solid #eee;'>", unsafe_allow_html=True)
-
-                    st.markdown("""
-                    <div style="display: flex; text-align: center; font-size: 0.8em; color: #888; margin-bottom: 5px;">
-                        <div style="flex: 1.5;"></div>
-                        <div style="flex: 2;">Full Bags</div>
-                        <div style="flex: 2;">Open</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Sizes grid mobile
-                    for size in LATEX_SIZES:
-                        qty_dict = row[size]
-                        full_qty = qty_dict.get('full', 0)
-                        open_qty = qty_dict.get('open', 0)
-                        
-                        thresholds = latex_thresholds[size]
-                        
-                        indicator = "🔴" if full_qty <= thresholds["low"] else "🟠" if full_qty <= thresholds["medium"] else "🟢"
-                        
-                        c_lbl, c_full, c_open = st.columns([1.5, 2, 2])
-                        with c_lbl:
-                            st.markdown('<div class="mobile-table-row" style="display:none;"></div>', unsafe_allow_html=True)
-                            st.markdown(f"{indicator} **{size}**")
-                            
-                        full_key = f"m_qty_l_full_{row['id']}_{size}"
-                        open_key = f"m_qty_l_open_{row['id']}_{size}"
-                        
-                        def on_l_full_change(idx=index, s=size, fk=full_key):
-                            new_f = st.session_state[fk]
-                            old_f = df.at[idx, s]['full']
-                            if new_f < old_f:
-                                current_month_str = datetime.now().strftime("%Y-%m")
-                                usage_dict = df.at[idx, 'monthly_usage']
-                                usage_dict[current_month_str] = usage_dict.get(current_month_str, 0) + (old_f - new_f)
-                            df.at[idx, s]['full'] = new_f
-                            save_data(df)
-                            
-                        def on_l_open_change(idx=index, s=size, fk=full_key, ok=open_key):
-                            new_o = st.session_state[ok]
-                            old_o = df.at[idx, s]['open']
-                            old_f = df.at[idx, s]['full']
-                            if new_o > old_o:
-                                if old_f > 0:
-                                    df.at[idx, s]['full'] = old_f - 1
-                                    df.at[idx, s]['open'] = new_o
-                                    st.session_state[fk] = old_f - 1
-                                    save_data(df)
-                                else:
-                                    st.session_state[ok] = old_o
-                                    st.toast(f"No full bags of {s} to open!")
-                            else:
-                                df.at[idx, s]['open'] = new_o
-                                save_data(df)
-
-                        with c_full:
-                            st.number_input(
-                                "f",
-                                min_value=0,
-                                value=int(full_qty),
-                                step=1,
-                                key=full_key,
-                                on_change=on_l_full_change,
-                                label_visibility="collapsed"
-                            )
-                        with c_open:
-                            st.number_input(
-                                "o",
-                                min_value=0,
-                                value=int(open_qty),
-                                step=1,
-                                key=open_key,
-                                on_change=on_l_open_change,
-                                label_visibility="collapsed"
-                            )
-
-    # --- TAB 2: FOIL ---
-    with tab_foil:
-        # Filter for Foil
-        foil_df = df[df['category'] == 'foil'].copy()
-        
-        # Search Foil
-        c_search, c_filter = st.columns([3, 1])
-        search_foil = c_search.text_input("🔍 Search Foils (e.g. 'Gold 1')", "", key="search_foil")
-        type_filter = c_filter.selectbox("Filter Type", ["All", "Number", "Letter", "Shape"])
-        
-        if search_foil:
-            foil_df = foil_df[foil_df['color'].str.contains(search_foil, case=False) | foil_df['design'].str.contains(search_foil, case=False)]
-        if type_filter != "All":
-            foil_df = foil_df[foil_df['foil_type'] == type_filter]
-            
-        # Sort so Numbers 0-9 appear in order
-        if not foil_df.empty:
-            foil_df = foil_df.sort_values(by=['foil_type', 'design'])
-
-        for index, row in foil_df.iterrows():
-            if view_mode == "💻 Desktop":
-                with st.container():
-                    # Foil Header: "Gold Number 1"
-                    st.markdown(f"### {row['color']} - {row['design']} ({row['foil_type']})")
-                    
-                    c1, c2 = st.columns([1, 6])
-                    with c1:
-                        # Square icon for foils
-                        st.markdown(f'<div style="background-color:{row["hex"]}; width:60px; height:60px; border-radius:10%; border: 2px solid #ddd;"></div>', unsafe_allow_html=True)
-                    
-                    with c2:
-                        cols = st.columns(3)
-                        # FOIL SIZES: Small vs Large
-                        foil_sizes = [("small", "Small (16in/Air)"), ("large", "Large (40in/Helium)")]
-                        
-                        for i, (field, label) in enumerate(foil_sizes):
-                            qty_dict = row[field]
-                            full_qty = qty_dict.get('full', 0)
-                            open_qty = qty_dict.get('open', 0)
-                            color_alert = "red" if full_qty == 0 else "green"
-                            cols[i].markdown(f"**{label}**")
-                            cols[i].markdown(f":{color_alert}[**{full_qty} Full**] | **{open_qty} Open**")
-                            
-                            btn_full_c1, btn_full_c2 = cols[i].columns(2)
-                            if btn_full_c1.button("➖ Full", key=f"d_f_f_sub_{row['id']}_{field}"):
-                                if full_qty > 0:
-                                    df.at[index, field]['full'] = full_qty - 1
-                                    current_month_str = datetime.now().strftime("%Y-%m")
-                                    usage_dict = df.at[index, 'monthly_usage']
-                                    usage_dict[current_month_str] = usage_dict.get(current_month_str, 0) + 1
-                                    save_data(df)
-                                    st.rerun()
-                            if btn_full_c2.button("➕ Full", key=f"d_f_f_add_{row['id']}_{field}"):
-                                df.at[index, field]['full'] = full_qty + 1
-                                save_data(df)
-                                st.rerun()
-                                
-                            btn_open_c1, btn_open_c2 = cols[i].columns(2)
-                            if btn_open_c1.button("➖ Open", key=f"d_f_o_sub_{row['id']}_{field}"):
-                                if open_qty > 0:
-                                    df.at[index, field]['open'] = open_qty - 1
-                                    save_data(df)
-                                    st.rerun()
-                            if btn_open_c2.button("➕ Open", key=f"d_f_o_add_{row['id']}_{field}"):
-                                if full_qty > 0:
-                                    df.at[index, field]['full'] = full_qty - 1
-                                    df.at[index, field]['open'] = open_qty + 1
-                                    save_data(df)
-                                    st.rerun()
-                    
-                    with st.popover("⚙️ Edit / Delete"):
-                        st.markdown(f"**Edit {row['color']} - {row['design']}**")
-                        new_brand = st.text_input("Brand", value=row['brand'], key=f"d_edit_brand_f_{row['id']}")
-                        new_color = st.text_input("Color Name", value=row['color'], key=f"d_edit_color_f_{row['id']}")
-                        new_design = st.text_input("Design", value=row['design'], key=f"d_edit_design_f_{row['id']}")
-                        foil_types = ["Number", "Letter", "Shape"]
-                        current_type_index = foil_types.index(row['foil_type']) if row['foil_type'] in foil_types else 0
-                        new_foil_type = st.selectbox("Foil Type", foil_types, index=current_type_index, key=f"d_edit_type_f_{row['id']}")
-                        new_hex = st.color_picker("Color Match", value=row['hex'], key=f"d_edit_hex_f_{row['id']}")
-
-                        if st.button("Save Changes", key=f"d_save_f_{row['id']}"):
-                            df.at[index, 'brand'] = new_brand
-                            df.at[index, 'color'] = new_color
-                            df.at[index, 'design'] = new_design
-                            df.at[index, 'foil_type'] = new_foil_type
-                            df.at[index, 'hex'] = new_hex
-                            save_data(df)
-                            st.rerun()
-                        
-                        st.divider()
-                        if st.checkbox("Confirm Delete", key=f"d_confirm_delete_f_{row['id']}"):
-                            if st.button("❌ Delete Permanently", type="primary", key=f"d_delete_f_{row['id']}"):
-                                df.drop(index, inplace=True)
-                                save_data(df)
-                                st.rerun()
-                                
-                    st.divider()
-            else: # Mobile
-                with st.container(border=True):
-                    st.markdown(
-                        f"""
-                        <div class="header-row-marker" style="display: flex; align-items: center; gap: 10px; margin-top: 5px; padding-right: 40px;">
-                            <div style="background-color:{row['hex']}; width:35px; height:35px; border-radius:10%; border: 1px solid #ddd; flex-shrink: 0;"></div>
-                            <div style="line-height: 1.2;">
-                                <strong>{row['color']} - {row['design']}</strong><br/>
-                                <span style="font-size: 0.9em;">({row['foil_type']})</span>
-                            </div>
-                        </div>
-                        """, 
-                        unsafe_allow_html=True
-                    )
-                    
-                    with st.popover("⚙️"):
-                        st.markdown(f"**Edit {row['color']} - {row['design']}**")
-                        new_brand = st.text_input("Brand", value=row['brand'], key=f"m_edit_brand_f_{row['id']}")
-                        new_color = st.text_input("Color Name", value=row['color'], key=f"m_edit_color_f_{row['id']}")
-                        new_design = st.text_input("Design", value=row['design'], key=f"m_edit_design_f_{row['id']}")
-                        foil_types = ["Number", "Letter", "Shape"]
-                        current_type_index = foil_types.index(row['foil_type']) if row['foil_type'] in foil_types else 0
-                        new_foil_type = st.selectbox("Foil Type", foil_types, index=current_type_index, key=f"m_edit_type_f_{row['id']}")
-                        new_hex = st.color_picker("Color Match", value=row['hex'], key=f"m_edit_hex_f_{row['id']}")
-
-                        if st.button("Save Changes", key=f"m_save_f_{row['id']}", use_container_width=True):
-                            df.at[index, 'brand'] = new_brand
-                            df.at[index, 'color'] = new_color
-                            df.at[index, 'design'] = new_design
-                            df.at[index, 'foil_type'] = new_foil_type
-                            df.at[index, 'hex'] = new_hex
-                            save_data(df)
-                            st.rerun()
-                        
-                        st.divider()
-                        if st.checkbox("Confirm Delete", key=f"m_confirm_delete_f_{row['id']}"):
-                            if st.button("❌ Delete Permanently", type="primary", key=f"m_delete_f_{row['id']}", use_container_width=True):
-                                df.drop(index, inplace=True)
-                                save_data(df)
-                                st.rerun()
-                    
-                    st.markdown("<hr style='margin: 10px 0; border: none; border-top: 1px solid #eee;'>", unsafe_allow_html=True)
-                    
-                    st.markdown("""
-                    <div style="display: flex; text-align: center; font-size: 0.8em; color: #888; margin-bottom: 5px;">
-                        <div style="flex: 1.5;"></div>
-                        <div style="flex: 2;">Full Bags</div>
-                        <div style="flex: 2;">Open</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # FOIL SIZES table mobile
-                    foil_sizes = [("small", "Small (16in)"), ("large", "Large (40in)")]
-                    for field, label in foil_sizes:
-                        qty_dict = row[field]
-                        full_qty = qty_dict.get('full', 0)
-                        open_qty = qty_dict.get('open', 0)
-                        
-                        indicator = "🔴" if full_qty == 0 else "🟢"
-                        
-                        c_lbl, c_full, c_open = st.columns([1.5, 2, 2])
-                        with c_lbl:
-                            st.markdown('<div class="mobile-table-row" style="display:none;"></div>', unsafe_allow_html=True)
-                            st.markdown(f"{indicator} **{label}**")
-                            
-                        full_key = f"m_qty_f_full_{row['id']}_{field}"
-                        open_key = f"m_qty_f_open_{row['id']}_{field}"
-                        
-                        def on_f_full_change(idx=index, fld=field, fk=full_key):
-                            new_f = st.session_state[fk]
-                            old_f = df.at[idx, fld]['full']
-                            if new_f < old_f:
-                                current_month_str = datetime.now().strftime("%Y-%m")
-                                usage_dict = df.at[idx, 'monthly_usage']
-                                usage_dict[current_month_str] = usage_dict.get(current_month_str, 0) + (old_f - new_f)
-                            df.at[idx, fld]['full'] = new_f
-                            save_data(df)
-                            
-                        def on_f_open_change(idx=index, fld=field, fk=full_key, ok=open_key, lbl=label):
-                            new_o = st.session_state[ok]
-                            old_o = df.at[idx, fld]['open']
-                            old_f = df.at[idx, fld]['full']
-                            if new_o > old_o:
-                                if old_f > 0:
-                                    df.at[idx, fld]['full'] = old_f - 1
-                                    df.at[idx, fld]['open'] = new_o
-                                    st.session_state[fk] = old_f - 1
-                                    save_data(df)
-                                else:
-                                    st.session_state[ok] = old_o
-                                    st.toast(f"No full bags of {lbl} to open!")
-                            else:
-                                df.at[idx, fld]['open'] = new_o
-                                save_data(df)
-
-                        with c_full:
-                            st.number_input(
-                                "f",
-                                min_value=0,
-                                value=int(full_qty),
-                                step=1,
-                                key=full_key,
-                                on_change=on_f_full_change,
-                                label_visibility="collapsed"
-                            )
-                        with c_open:
-                            st.number_input(
-                                "o",
-                                min_value=0,
-                                value=int(open_qty),
-                                step=1,
-                                key=open_key,
-                                on_change=on_f_open_change,
-                                label_visibility="collapsed"
-                            )
-
-# --- PAGE: ADD MANUALLY ---
-elif page == "Add Manually":
-    st.title("➕ Add New Inventory")
-    
-    type_choice = st.radio("What are you adding?", ["🔵 Latex Balloon", "✨ Foil Balloon"], horizontal=True)
-    
-    with st.form("add_form"):
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            brand = st.text_input("Brand", "Tuftex")
-            color = st.text_input("Color Name", "Gold")
-            hex_code = st.color_picker("Color Match", "#D4AF37")
-            
-        with col2:
-            if type_choice == "🔵 Latex Balloon":
-                category = "latex"
-                foil_type = ""
-                design = ""
-                st.info(f"Creating a standard color family ({'/'.join(LATEX_SIZES)})")
-            else:
-                category = "foil"
-                foil_type = st.selectbox("Foil Type", ["Number", "Letter", "Shape"])
-                design = st.text_input("Design/Value (e.g. '1', 'A', 'Star')")
-                st.info("Creating a foil entry (Small/Large)")
-
-        submitted = st.form_submit_button("Create Entry")
-        
-        if submitted:
-            new_id = df['id'].max() + 1 if not df.empty else 1
-            new_row = {
-                "id": new_id, 
-                "category": category,
-                "brand": brand, 
-                "color": color, 
-                "hex": hex_code,
-                "foil_type": foil_type,
-                "design": design,
-                "5in": {"full": 0, "open": 0}, "11in": {"full": 0, "open": 0}, "17in": {"full": 0, "open": 0}, "24in": {"full": 0, "open": 0}, "32in": {"full": 0, "open": 0}, # Latex fields
-                "small": {"full": 0, "open": 0}, "large": {"full": 0, "open": 0}, # Foil fields
-                "barcodes": {},
-                "monthly_usage": {}
-            }
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            save_data(df)
-            st.success(f"Added {color} {design} to {category} list!")
-
-# --- PAGE: ANALYTICS ---
-elif page == "Analytics":
-    st.title("📊 Usage Trends")
-    st.markdown("Analyze balloon usage by month and compare year-over-year data.")
-    
-    if not df.empty:
-        # --- Data Preparation ---
-        # Get all available year-month keys from the data
-        all_months = set()
-        for usage_dict in df['monthly_usage']:
-            if isinstance(usage_dict, dict):
-                all_months.update(usage_dict.keys())
-        
-        if not all_months:
-            st.info("No usage data recorded yet. Start using balloons (clicking ➖) to see trends here.")
-        else:
-            sorted_months = sorted(list(all_months), reverse=True)
-            
-            # --- UI Filters ---
-            selected_month_str = st.selectbox("Select Month to Analyze", sorted_months)
-            
-            # --- Chart for Selected Month ---
-            st.header(f"Usage for {datetime.strptime(selected_month_str, '%Y-%m').strftime('%B %Y')}")
-            
-            # Create a dataframe for the chart
-            df['current_month_usage'] = df['monthly_usage'].apply(lambda x: x.get(selected_month_str, 0) if isinstance(x, dict) else 0)
-            chart_df = df[df['current_month_usage'] > 0].copy()
-            chart_df = chart_df.sort_values(by='current_month_usage', ascending=False).head(15)
-            
-            if chart_df.empty:
-                st.write("No balloons were used in this month.")
-            else:
-                chart_df['Label'] = chart_df.apply(lambda x: f"{x['color']} {x['design']}" if x['category'] == 'foil' else x['color'], axis=1)
-                st.bar_chart(chart_df.set_index('Label')['current_month_usage'])
-
-                # --- Year-over-Year Comparison ---
-                st.header("Year-over-Year Comparison")
-                try:
-                    current_date = datetime.strptime(selected_month_str, '%Y-%m')
-                    last_year_date = current_date.replace(year=current_date.year - 1)
-                    last_year_month_str = last_year_date.strftime('%Y-%m')
-
-                    if last_year_month_str in all_months:
-                        df['last_year_usage'] = df['monthly_usage'].apply(lambda x: x.get(last_year_month_str, 0) if isinstance(x, dict) else 0)
-                        
-                        # Combine data for comparison view
-                        comparison_df = df[['category', 'color', 'design', 'current_month_usage', 'last_year_usage']].copy()
-                        comparison_df = comparison_df[(comparison_df['current_month_usage'] > 0) | (comparison_df['last_year_usage'] > 0)]
-                        comparison_df['Label'] = comparison_df.apply(lambda x: f"{x['color']} {x['design']}" if x['category'] == 'foil' else x['color'], axis=1)
-                        comparison_df['Change'] = comparison_df['current_month_usage'] - comparison_df['last_year_usage']
-                        
-                        st.write(f"Comparing {selected_month_str} with {last_year_month_str}")
-                        st.dataframe(comparison_df[['Label', 'current_month_usage', 'last_year_usage', 'Change']].rename(columns={
-                            'current_month_usage': f'Usage ({selected_month_str})',
-                            'last_year_usage': f'Usage ({last_year_month_str})'
-                        }).set_index('Label'))
-
-                    else:
-                        st.info(f"No data available for {last_year_month_str} to compare.")
-                except Exception as e:
-                    st.error(f"Could not perform year-over-year comparison: {e}")
-
-    else:
-        st.info("No inventory data found.")
-
-# --- PAGE: SETTINGS ---
-elif page == "Settings":
-    st.title("⚙️ Settings")
-    st.header("Latex Stock Thresholds")
-    st.write("Set the bag count at which stock is considered 'Low' (red) or 'Medium' (orange).")
-
-    # Use a copy of the loaded settings to allow for changes
-    updated_thresholds = latex_thresholds.copy()
-
-    for size in LATEX_SIZES:
-        st.subheader(f"{size} Balloons")
-        col1, col2 = st.columns(2)
-        low_val = col1.number_input(
-            "Low Stock Threshold (<=)", 
-            min_value=0, 
-            value=updated_thresholds[size]["low"], 
-            key=f"low_{size}"
-        )
-        medium_val = col2.number_input(
-            "Medium Stock Threshold (<=)", 
-            min_value=low_val,
-            value=updated_thresholds[size]["medium"], 
-            key=f"medium_{size}"
-        )
-        # Update the dictionary with new values from the UI
-        updated_thresholds[size] = {"low": low_val, "medium": medium_val}
-
-    if st.button("Save Settings"):
-        save_settings(updated_thresholds)
-        st.success("Settings saved successfully!")
-        st.rerun()
-
-# --- PAGE: SCANNER HUB ---
-elif page == "Scanner Hub":
-    st.title("🎯 Scanner Hub")
-    
-    st.markdown("""
-    <style>
-    /* Make the radio buttons huge for easy tapping */
-    div.row-widget.stRadio > div{
-        flex-direction:row;
-        align-items: stretch;
-    }
-    div.row-widget.stRadio > div > label {
-        padding: 20px !important;
-        background-color: #f0f2f6;
-        border-radius: 10px;
-        margin-right: 10px;
-        text-align: center;
-        flex: 1;
-        cursor: pointer;
-    }
-    div.row-widget.stRadio > div > label[data-checked="true"] {
-        background-color: #4CAF50;
-        color: white;
-    }
-    /* Hide the actual radio circle */
-    div.row-widget.stRadio > div > label > div:first-child {
-        display: none;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    # Initialize session state for manual link
-    if "unknown_barcode" not in st.session_state:
-        st.session_state.unknown_barcode = None
-
-    # Scanner Modes
-    mode = st.radio(
-        "Select Action", 
-        ["🔵 RECEIVING\n(Add Full)", "🟡 OPENING\n(Full ➔ Open)", "🔴 TRASHING\n(Use Open)"],
-        label_visibility="collapsed"
-    )
-    
-    st.divider()
-
-    # If we have an unknown barcode, show the linking UI
-    if st.session_state.unknown_barcode:
-        st.warning(f"Barcode **{st.session_state.unknown_barcode}** not recognized!")
-        st.write("Please link this barcode to an existing item:")
-        
-        with st.form("link_barcode_form"):
-            # Create a selection list of all items and sizes
-            item_options = []
-            for index, row in df.iterrows():
-                label_base = f"{row['brand']} - {row['color']}" if row['category'] == 'latex' else f"{row['color']} {row['design']} ({row['foil_type']})"
-                sizes = LATEX_SIZES if row['category'] == 'latex' else ["small", "large"]
-                for size in sizes:
-                    item_options.append({"label": f"{label_base} - {size}", "id": row['id'], "size": size})
-            
-            selected_item_label = st.selectbox("Select Item", [opt["label"] for opt in item_options])
-            
-            c1, c2 = st.columns(2)
-            with c1:
-                if st.form_submit_button("🔗 Link & Process", type="primary", use_container_width=True):
-                    # Find the selected item details
-                    selected_opt = next(opt for opt in item_options if opt["label"] == selected_item_label)
-                    item_id = selected_opt["id"]
-                    item_size = selected_opt["size"]
-                    
-                    # Update database
-                    idx = df.index[df['id'] == item_id][0]
-                    
-                    # Ensure barcodes dict exists and the size list exists
-                    if 'barcodes' not in df.at[idx]:
-                        df.at[idx, 'barcodes'] = {}
-                    if not isinstance(df.at[idx, 'barcodes'], dict):
-                        df.at[idx, 'barcodes'] = {}
-                        
-                    barcodes_dict = df.at[idx, 'barcodes']
-                    if item_size not in barcodes_dict:
-                        barcodes_dict[item_size] = []
-                    
-                    barcodes_dict[item_size].append(st.session_state.unknown_barcode)
-                    df.at[idx, 'barcodes'] = barcodes_dict
-                    
-                    # Also process the scan based on current mode!
-                    qty_dict = df.at[idx, item_size]
-                    if mode.startswith("🔵"): # Receiving
-                        qty_dict['full'] += 1
-                        action_msg = f"Added 1 Full bag to {selected_item_label}"
-                    elif mode.startswith("🟡"): # Opening
-                        if qty_dict['full'] > 0:
-                            qty_dict['full'] -= 1
-                            qty_dict['open'] += 1
-                            action_msg = f"Opened 1 bag of {selected_item_label}"
-                        else:
-                            action_msg = f"Cannot open: No full bags of {selected_item_label} in stock."
-                    else: # Trashing
-                        if qty_dict['open'] > 0:
-                            qty_dict['open'] -= 1
-                            action_msg = f"Trashed 1 open bag of {selected_item_label}"
-                        elif qty_dict['full'] > 0:
-                            qty_dict['full'] -= 1
-                            action_msg = f"Trashed 1 full bag of {selected_item_label}"
-                        else:
-                            action_msg = f"Cannot trash: No stock of {selected_item_label}."
-                            
-                        # Log usage
-                        current_month_str = datetime.now().strftime("%Y-%m")
-                        usage_dict = df.at[idx, 'monthly_usage']
-                        usage_dict[current_month_str] = usage_dict.get(current_month_str, 0) + 1
-                        df.at[idx, 'monthly_usage'] = usage_dict
-                    
-                    df.at[idx, item_size] = qty_dict
-                    save_data(df)
-                    
-                    st.session_state.unknown_barcode = None
-                    st.toast(action_msg)
-                    st.rerun()
-            with c2:
-                if st.form_submit_button("Cancel", use_container_width=True):
-                    st.session_state.unknown_barcode = None
-                    st.rerun()
-
-    else:
-        # Standard Scanning UI
-        def handle_scan():
-            scanned_code = st.session_state.barcode_input.strip()
-            if not scanned_code:
-                return
-                
-            # Search for barcode
-            found = False
-            for index, row in df.iterrows():
-                barcodes_dict = row.get('barcodes', {})
-                if not isinstance(barcodes_dict, dict): continue
-                
-                for size, code_list in barcodes_dict.items():
-                    if scanned_code in code_list:
-                        # FOUND IT!
-                        found = True
-                        label_base = f"{row['brand']} - {row['color']}" if row['category'] == 'latex' else f"{row['color']} {row['design']} ({row['foil_type']})"
-                        item_label = f"{label_base} - {size}"
-                        
-                        qty_dict = df.at[index, size]
-                        
-                        if mode.startswith("🔵"): # Receiving
-                            qty_dict['full'] += 1
-                            action_msg = f"✅ Added 1 Full bag to {item_label}"
-                        elif mode.startswith("🟡"): # Opening
-                            if qty_dict['full'] > 0:
-                                qty_dict['full'] -= 1
-                                qty_dict['open'] += 1
-                                action_msg = f"✅ Opened 1 bag of {item_label}"
-                            else:
-                                action_msg = f"❌ Cannot open: No full bags of {item_label} in stock."
-                        else: # Trashing
-                            if qty_dict['open'] > 0:
-                                qty_dict['open'] -= 1
-                                action_msg = f"🗑️ Trashed 1 open bag of {item_label}"
-                            elif qty_dict['full'] > 0:
-                                qty_dict['full'] -= 1
-                                action_msg = f"🗑️ Trashed 1 full bag of {item_label}"
-                            else:
-                                action_msg = f"❌ Cannot trash: No stock of {item_label}."
-                                
-                            # Log usage if trashed
-                            if "🗑️" in action_msg:
-                                current_month_str = datetime.now().strftime("%Y-%m")
-                                usage_dict = df.at[index, 'monthly_usage']
-                                usage_dict[current_month_str] = usage_dict.get(current_month_str, 0) + 1
-                                df.at[index, 'monthly_usage'] = usage_dict
-
-                        df.at[index, size] = qty_dict
-                        save_data(df)
-                        st.toast(action_msg)
-                        break
-                if found:
-                    break
-            
-            if not found:
-                st.session_state.unknown_barcode = scanned_code
-                
-            # Clear input for next scan
-            st.session_state.barcode_input = ""
-
-        # The actual input field
-        st.text_input(
-            "Scan Barcode Here", 
-            key="barcode_input", 
-            on_change=handle_scan,
-            help="Ensure this box is selected before pulling the scanner trigger."
-        )
-        st.info("💡 Keep the text box above selected. When the scanner beeps, it will automatically process and clear itself for the next scan.")
-
-# --- PAGE: SCAN SHIPMENT ---
-elif page == "Scan Shipment":
-    st.title("📷 Scan New Shipment")
-    st.write("Upload a photo of the balloon bags. The AI will identify them and update your inventory.")
-
-    img_file = st.file_uploader("Upload Image", type=["jpg", "jpeg", "png"])
-    
-    if img_file:
-        image = Image.open(img_file)
-        st.image(image, caption="Uploaded Image", width=500)
-
-        if st.button("Analyze Image"):
-            detected_items = analyze_image_with_gemini(image)
-
-            if detected_items:
-                st.success(f"AI Found {len(detected_items)} item(s)!")
-                st.subheader("Processing Results:")
-                
-                updated_count = 0
-                new_item_warnings = []
-
-                for item in detected_items:
-                    category = item.get('category')
-                    
-                    if category == 'latex':
-                        brand = item.get('brand', 'Unknown')
-                        color = item.get('color', 'Unknown')
-                        size = item.get('size')
-                        
-                        if size not in LATEX_SIZES:
-                            st.warning(f"Skipping '{color}' - AI returned unknown size '{size}'.")
-                            continue
-
-                        # Case-insensitive matching
-                        mask = (df['category'] == 'latex') & (df['brand'].str.lower() == brand.lower()) & (df['color'].str.lower() == color.lower())
-                        if mask.any():
-                            idx = df[mask].index[0]
-                            df.at[idx, size] += 1
-                            st.write(f"✅ Added 1 bag to **{df.at[idx, 'brand']} {df.at[idx, 'color']} ({size})**.")
-                            updated_count += 1
-                        else:
-                            new_item_warnings.append(f"Latex: **{brand} {color}**. Please add it via 'Add Manually'.")
-
-                    elif category == 'foil':
-                        brand = item.get('brand', 'Unknown')
-                        color = item.get('color', 'Unknown')
-                        design = item.get('design', 'Unknown')
-                        size_field = "large" if item.get('size') == "large" else "small"
-                        
-                        mask = (df['category'] == 'foil') & (df['brand'].str.lower() == brand.lower()) & (df['color'].str.lower() == color.lower()) & (df['design'].str.lower() == design.lower())
-                        if mask.any():
-                            idx = df[mask].index[0]
-                            df.at[idx, size_field] += 1
-                            st.write(f"✅ Added 1 to **{df.at[idx, 'color']} {df.at[idx, 'design']} ({size_field})**.")
-                            updated_count += 1
-                        else:
-                            new_item_warnings.append(f"Foil: **{brand} {color} {design}**. Please add it via 'Add Manually'.")
-                
-                if updated_count > 0:
-                    save_data(df)
-                    st.toast(f"Successfully updated {updated_count} inventory item(s)!")
-                
-                if new_item_warnings:
-                    st.warning("Some items are new and could not be added automatically:")
-                    for warning in set(new_item_warnings):
-                        st.markdown(f"- {warning}")
-            else:
-                st.warning("The AI could not detect any balloon bags in the image. Please try another photo.")
+import streamlit as st
+from streamlit_js_eval import streamlit_js_eval
+import pandas as pd
+import numpy as np
+import atexit
+import io
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# orjson is ~5x faster than stdlib json on the encode/decode hot path;
+# fall back to stdlib if it isn't installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# --- CONFIGURATION ---
+DB_FILE = "balloon_inventory.json"
+LOG_FILE = "inventory.log"
+SETTINGS_FILE = "settings.json"
+
+# Compact the mutation log back into the snapshot once it grows past this many lines
+LOG_COMPACT_LINES = 500
+
+# Bumped whenever the per-entry migration in load_data() changes; a snapshot
+# stamped with the current schema skips the migration pass entirely
+CURRENT_SCHEMA = 2
+
+# Strips the Markdown code fence Gemini tends to wrap JSON output in,
+# tolerating the optional 'json' tag and surrounding whitespace
+_FENCE_RE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+LATEX_SIZES = ["5in", "11in", "17in", "24in", "32in"]
+
+# Computed once per script run so hot paths don't re-run strftime
+CURRENT_MONTH_STR = datetime.now().strftime("%Y-%m")
+DEFAULT_THRESHOLDS = {
+    "5in": {"low": 2, "medium": 5},
+    "11in": {"low": 2, "medium": 5},
+    "17in": {"low": 1, "medium": 3},
+    "24in": {"low": 1, "medium": 2},
+    "32in": {"low": 1, "medium": 2},
+}
+
+# --- 1. BACKEND FUNCTIONS ---
+
+def json_dumps(obj):
+    """Serializes to a JSON string, via orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj)
+
+def json_loads(text):
+    """Parses a JSON string, via orjson when available."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def file_mtime(path):
+    """Returns the file's mtime, or 0 if it doesn't exist yet (used as a cache key)."""
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+# Debounce window for the background writer: consecutive saves to the same
+# file within this window collapse into one disk write
+WRITE_DEBOUNCE_SECS = 0.2
+
+def trim_log(cutoff):
+    """Drops the journal prefix a now-durable snapshot has folded in.
+
+    Ops appended after the snapshot was serialized (i.e. past the cutoff)
+    are kept — they are not in the snapshot yet.
+    """
+    try:
+        with open(LOG_FILE, 'rb') as f:
+            f.seek(cutoff)
+            tail = f.read()
+        if tail:
+            with open(LOG_FILE, 'wb') as f:
+                f.write(tail)
+        else:
+            os.remove(LOG_FILE)
+    except FileNotFoundError:
+        pass
+
+@st.cache_resource(show_spinner=False)
+def get_writer():
+    """Background file writer shared by all sessions (write-behind).
+
+    Snapshot/settings saves land in `pending` (path -> latest (text, journal
+    cutoff)) and a daemon thread flushes them to disk, so the click -> rerun
+    path never blocks on open/write/fsync. Writes to the same path inside the
+    debounce window coalesce into a single disk write. Readers consult
+    `pending` first (see load_data/load_settings) so a rerun right after a
+    save never sees a stale file.
+    """
+    pending = {}
+    lock = threading.Lock()
+    q = queue.Queue()
+
+    def flush(path):
+        with lock:
+            item = pending.get(path)
+        if item is None:
+            return  # coalesced into an earlier flush
+        text, log_cutoff = item
+        with open(path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        # The journal is only obsolete once the snapshot subsuming it is
+        # safely on disk — which is now
+        if log_cutoff:
+            trim_log(log_cutoff)
+        # Only drop the pending copy if no newer save arrived mid-write
+        with lock:
+            if pending.get(path) is item:
+                del pending[path]
+
+    def worker():
+        while True:
+            path = q.get()
+            time.sleep(WRITE_DEBOUNCE_SECS)
+            flush(path)
+            q.task_done()
+
+    threading.Thread(target=worker, daemon=True).start()
+
+    def drain():
+        # Flush whatever is still queued before the process exits
+        with lock:
+            paths = list(pending)
+        for path in paths:
+            flush(path)
+
+    atexit.register(drain)
+    return pending, lock, q
+
+def enqueue_write(path, text, log_cutoff=0):
+    """Hands a file write to the background writer and returns immediately.
+
+    log_cutoff is how many journal bytes the text already folds in; the
+    flush trims exactly that prefix once the write is durable.
+    """
+    pending, lock, q = get_writer()
+    with lock:
+        pending[path] = (text, log_cutoff)
+    q.put(path)
+
+def pending_write(path):
+    """Latest not-yet-flushed (text, journal cutoff) for the path, or None.
+
+    The read-your-writes gate: readers take this over the file on disk.
+    """
+    pending, lock, _ = get_writer()
+    with lock:
+        return pending.get(path)
+
+@st.cache_data(show_spinner=False)
+def load_settings(mtime):
+    """Loads thresholds from JSON file or creates it with defaults. Cached on the file's mtime."""
+    pending = pending_write(SETTINGS_FILE)
+    if pending is not None:
+        return json_loads(pending[0])
+
+    if not os.path.exists(SETTINGS_FILE):
+        with open(SETTINGS_FILE, 'w') as f:
+            f.write(json_dumps(DEFAULT_THRESHOLDS))
+        return DEFAULT_THRESHOLDS
+
+    with open(SETTINGS_FILE, 'r') as f:
+        return json_loads(f.read())
+
+def save_settings(settings_data):
+    """Saves the thresholds back to JSON (written behind by the background writer)."""
+    enqueue_write(SETTINGS_FILE, json_dumps(settings_data))
+    load_settings.clear()
+
+def ensure_entry_schema(entries):
+    """Backfills keys the UI indexes unconditionally.
+
+    The DataFrame-era code NaN-filled ragged rows, so databases seeded before
+    the dict store carry foils without a brand and latex rows without the
+    foil fields; the plain dicts have no such safety net.
+    """
+    for entry in entries:
+        entry.setdefault("brand", "")
+        entry.setdefault("foil_type", "")
+        entry.setdefault("design", "")
+        entry.setdefault("barcodes", {})
+        entry.setdefault("monthly_usage", {})
+        sizes = LATEX_SIZES if entry.get("category") == "latex" else []
+        for size in sizes + ["small", "large"]:
+            entry.setdefault(size, {"full": 0, "open": 0})
+    return entries
+
+def replay_log(data, start=0):
+    """Folds journaled mutations from LOG_FILE into the snapshot entries.
+
+    start skips the journal prefix a pending snapshot has already folded in
+    (save_data records it as the cutoff), replaying only ops appended since.
+    """
+    if not os.path.exists(LOG_FILE):
+        return data
+    by_id = {entry["id"]: entry for entry in data}
+    with open(LOG_FILE, 'rb') as f:
+        if start:
+            f.seek(start)
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                op = json_loads(line)
+            except:
+                continue
+            entry = by_id.get(op.get("id"))
+            if entry is None:  # item was deleted after the op was journaled
+                continue
+            if op.get("field"):
+                qty_dict = entry[op["field"]]
+                qty_dict[op["sub"]] = max(0, qty_dict[op["sub"]] + op["delta"])
+            if op.get("usage"):
+                month = op.get("month", CURRENT_MONTH_STR)
+                entry["monthly_usage"][month] = entry["monthly_usage"].get(month, 0) + op["usage"]
+    return data
+
+def apply_mutation(inventory, op):
+    """Applies a single inventory mutation in memory and journals it to LOG_FILE.
+
+    Quantity ops look like {"id": 3, "field": "small", "sub": "full", "delta": -1};
+    add "usage": n to also count n balloons used this month. Appending one short
+    line is O(1) per click instead of rewriting the whole snapshot; the log is
+    folded back into the snapshot by save_data() once it grows too big.
+    """
+    entry = inventory[op["id"]]
+    if op.get("field"):
+        qty_dict = entry[op["field"]]
+        qty_dict[op["sub"]] = max(0, qty_dict[op["sub"]] + op["delta"])
+    if op.get("usage"):
+        op["month"] = CURRENT_MONTH_STR
+        usage_dict = entry['monthly_usage']
+        usage_dict[op["month"]] = usage_dict.get(op["month"], 0) + op["usage"]
+    with open(LOG_FILE, 'a') as f:
+        f.write(json_dumps(op) + "\n")
+        f.flush()
+    load_data.clear()
+    # Periodic compaction: rewrite the snapshot and truncate the log
+    with open(LOG_FILE, 'r') as f:
+        log_lines = sum(1 for _ in f)
+    if log_lines >= LOG_COMPACT_LINES:
+        save_data(inventory)
+
+@st.cache_data(show_spinner=False)
+def search_blobs(mtime, log_mtime):
+    """Lowercased 'color brand design' haystack per entry id.
+
+    Built once per file state so searches do one plain substring test per
+    entry instead of lowercasing several fields on every keystroke.
+    """
+    return {
+        i: f"{e.get('color', '')} {e.get('brand', '')} {e.get('design', '')}".lower()
+        for i, e in load_data(mtime, log_mtime).items()
+    }
+
+@st.cache_data(show_spinner=False)
+def filter_inventory_ids(mtime, log_mtime, category, search, type_filter):
+    """Ids of entries in a category matching the search/type filters.
+
+    Cached on (file state, filters) so plain reruns and repeated searches
+    skip the scan; the Inventory tabs map the ids back onto the live dict.
+    """
+    entries = [e for e in load_data(mtime, log_mtime).values() if e['category'] == category]
+    if search:
+        blobs = search_blobs(mtime, log_mtime)
+        needle = search.lower()
+        entries = [e for e in entries if needle in blobs[e['id']]]
+    if type_filter and type_filter != "All":
+        entries = [e for e in entries if e['foil_type'] == type_filter]
+    if category == 'foil':
+        # Sort so Numbers 0-9 appear in order
+        entries.sort(key=lambda e: (e['foil_type'], e['design']))
+    return [e['id'] for e in entries]
+
+@st.cache_data(show_spinner=False)
+def usage_months(mtime, log_mtime):
+    """Sorted (newest first) list of all YYYY-MM keys across monthly_usage dicts."""
+    inventory = load_data(mtime, log_mtime)
+    months = set().union(*(e['monthly_usage'].keys() for e in inventory.values() if isinstance(e.get('monthly_usage'), dict)))
+    return sorted(months, reverse=True)
+
+@st.cache_data(show_spinner=False)
+def load_data(mtime, log_mtime):
+    """Loads inventory and handles migration for new fields (Foils, Usage, Barcodes, Open Bags).
+
+    Cached on the snapshot and log mtimes so widget interactions don't re-read
+    and re-migrate the whole file on every rerun. Journaled mutations from
+    LOG_FILE are replayed on top of the snapshot. Returns a plain dict keyed
+    by item id — the handful of inventory rows don't justify DataFrame
+    construction/serialization overhead on every rerun.
+    """
+    if not os.path.exists(DB_FILE):
+        # Initial dummy data
+        initial_data = [
+            # Latex Examples (full entry schema — the dict store indexes every key directly)
+            {"id": 1, "category": "latex", "brand": "Tuftex", "color": "Burnt Orange", "hex": "#CC5500", "foil_type": "", "design": "", "5in": {"full": 2, "open": 0}, "11in": {"full": 5, "open": 0}, "17in": {"full": 1, "open": 0}, "24in": {"full": 0, "open": 0}, "32in": {"full": 0, "open": 0}, "small": {"full": 0, "open": 0}, "large": {"full": 0, "open": 0}, "barcodes": {}, "monthly_usage": {}},
+            {"id": 2, "category": "latex", "brand": "Sempertex", "color": "White Sand", "hex": "#E8E3D9", "foil_type": "", "design": "", "5in": {"full": 10, "open": 0}, "11in": {"full": 8, "open": 0}, "17in": {"full": 4, "open": 0}, "24in": {"full": 2, "open": 0}, "32in": {"full": 1, "open": 0}, "small": {"full": 0, "open": 0}, "large": {"full": 0, "open": 0}, "barcodes": {}, "monthly_usage": {"2025-02": 5}},
+            # Foil Examples
+            {"id": 3, "category": "foil", "brand": "Anagram", "foil_type": "Number", "design": "1", "color": "Gold", "hex": "#D4AF37", "small": {"full": 2, "open": 0}, "large": {"full": 4, "open": 0}, "barcodes": {}, "monthly_usage": {"2026-01": 1}},
+            {"id": 4, "category": "foil", "brand": "Anagram", "foil_type": "Shape", "design": "Dinosaur", "color": "Green", "hex": "#228B22", "small": {"full": 0, "open": 0}, "large": {"full": 2, "open": 0}, "barcodes": {}, "monthly_usage": {}},
+        ]
+        with open(DB_FILE, 'w') as f:
+            f.write(json_dumps({"schema": CURRENT_SCHEMA, "entries": initial_data}))
+
+    # A just-enqueued save supersedes whatever is on disk, and already folds
+    # in the journal up to its recorded cutoff
+    pending = pending_write(DB_FILE)
+    if pending is not None:
+        text, replay_from = pending
+    else:
+        replay_from = 0
+        with open(DB_FILE, 'r') as f:
+            text = f.read()
+    try:
+        data = json_loads(text)
+    except:
+        return {}
+
+    # Already migrated and stamped: skip the per-entry migration pass
+    if isinstance(data, dict) and data.get("schema") == CURRENT_SCHEMA:
+        entries = ensure_entry_schema(replay_log(data.get("entries", []), replay_from))
+        return {entry["id"]: entry for entry in entries}
+
+    # --- MIGRATION: UPGRADE OLD (UNSTAMPED) DATA TO SUPPORT FOILS, USAGE, BARCODES & OPEN BAGS ---
+    # A stamped snapshot from an older (or unknown) schema still carries its
+    # entries — run them through the migration pass and restamp, never discard
+    if isinstance(data, dict):
+        data = data.get("entries", [])
+    data = data if isinstance(data, list) else []
+    if data:
+        current_month_str = CURRENT_MONTH_STR
+        for entry in data:
+            # 1. Add Category if missing (assume Latex)
+            if "category" not in entry:
+                entry["category"] = "latex"
+            
+            # 2. Add Foil Fields if missing
+            if "foil_type" not in entry:
+                entry["foil_type"] = "" # Number, Letter, Shape
+                entry["design"] = ""    # "1", "A", "Star"
+                entry["small"] = 0      # Will migrate to dict below
+                entry["large"] = 0      
+            
+            # 3. Add 32in size if missing
+            if "32in" not in entry:
+                entry["32in"] = 0
+            
+            # 4. Migrate from 'usage' to 'monthly_usage'
+            if "monthly_usage" not in entry:
+                usage_val = entry.get("usage", 0)
+                entry["monthly_usage"] = {}
+                if usage_val > 0:
+                    entry["monthly_usage"][current_month_str] = usage_val
+                if "usage" in entry:
+                    del entry["usage"]
+                    
+            # 5. Add barcodes dictionary mapping size -> list of barcodes
+            if "barcodes" not in entry:
+                entry["barcodes"] = {}
+                
+            # 6. Migrate sizes from ints to dicts {"full": X, "open": Y}
+            sizes_to_check = LATEX_SIZES if entry["category"] == "latex" else ["small", "large"]
+            for size in sizes_to_check:
+                if size in entry and isinstance(entry[size], int):
+                    val = entry[size]
+                    entry[size] = {"full": val, "open": 0}
+                elif size not in entry:
+                    entry[size] = {"full": 0, "open": 0}
+
+    # Stamp the migrated snapshot so the next load takes the fast path
+    with open(DB_FILE, 'w') as f:
+        f.write(json_dumps({"schema": CURRENT_SCHEMA, "entries": data}))
+
+    data = ensure_entry_schema(replay_log(data))
+    return {entry["id"]: entry for entry in data}
+
+def save_data(inventory):
+    # Serialize now (the caller mutates entries in place) and let the
+    # background writer get it to disk off the critical path. The journal
+    # stays put until the flush has fsynced the snapshot that subsumes it —
+    # a crash inside the debounce window must not lose journaled clicks —
+    # so record how many of its bytes this snapshot folds in.
+    log_cutoff = os.path.getsize(LOG_FILE) if os.path.exists(LOG_FILE) else 0
+    enqueue_write(DB_FILE, json_dumps({"schema": CURRENT_SCHEMA, "entries": list(inventory.values())}), log_cutoff)
+    # Everything keyed on the file mtimes must go too: the mtimes won't budge
+    # until the background flush lands, so a rerun right after a delete would
+    # otherwise get id lists for entries that no longer exist
+    load_data.clear()
+    search_blobs.clear()
+    filter_inventory_ids.clear()
+    usage_months.clear()
+
+@st.cache_resource
+def get_gemini_model():
+    """Configures the SDK once and returns a reusable model handle.
+
+    google.generativeai drags in grpc/protobuf, so it is imported lazily here
+    rather than at module top — pages that never touch the AI don't pay for it.
+    """
+    import google.generativeai as genai
+    genai.configure(api_key=st.secrets["API_KEY"])
+    return genai.GenerativeModel('gemini-1.5-flash')
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def analyze_images_with_gemini(images_bytes):
+    """Runs Gemini over a tuple of raw upload bytes in a single API call.
+
+    Batching all photos into one request amortizes the network round trip
+    and prompt tokens across the shipment. Cached on the bytes hashes for an
+    hour, so re-analyzing the same photos (reruns, retries) skips the
+    network call. Raises on API errors so failures aren't cached; the
+    caller shows the error.
+    """
+    from PIL import Image
+
+    model = get_gemini_model()
+    images = [Image.open(io.BytesIO(b)) for b in images_bytes]
+
+    # Updated prompt to handle Foils
+    prompt = """
+    Analyze these images of balloon packaging. For every balloon bag visible
+    across all images:
+    1. Determine if it is LATEX (standard round) or FOIL (mylar shapes/numbers).
+    2. Extract Brand, Color.
+    3. If FOIL: Extract the Shape/Design (e.g., "Number 1", "Letter A", "Star") and Type (Number/Letter/Shape).
+    4. If LATEX: Extract Size (5in, 11in, etc).
+
+    Return ONE combined JSON list covering all images. Examples:
+    [{"category": "latex", "brand": "Tuftex", "color": "Cocoa", "size": "11in"}]
+    [{"category": "foil", "brand": "Northstar", "color": "Gold", "foil_type": "Number", "design": "1", "size": "large"}]
+    """
+
+    response = model.generate_content([prompt, *images])
+    text = response.text.strip()
+    m = _FENCE_RE.match(text)
+    if m:
+        text = m.group(1)
+    return json_loads(text)
+
+# --- 2. FRONTEND UI ---
+
+st.set_page_config(page_title="PopStock", page_icon="🎈", layout="wide")
+
+# --- AUTHENTICATION ---
+def check_password():
+    """Returns `True` if the user had the correct password."""
+
+    def password_entered():
+        """Checks whether a password entered by the user is correct."""
+        if "APP_PASSWORD" in st.secrets:
+            if st.session_state.get("password", "") == st.secrets["APP_PASSWORD"]:
+                st.session_state["password_correct"] = True
+                if "password" in st.session_state:
+                    del st.session_state["password"]  # don't store password
+            else:
+                st.session_state["password_correct"] = False
+        else:
+            # If no password is set in secrets, allow access (or you could choose to block)
+            st.warning("No 'APP_PASSWORD' found in Streamlit secrets. App is open to public.")
+            st.session_state["password_correct"] = True
+
+    def render_login_ui(show_error=False):
+        st.markdown(
+            """
+            <style>
+            /* Make the password input look like a PIN pad */
+            div[data-baseweb="input"] input[type="password"] {
+                text-align: center !important;
+                font-size: 2rem !important;
+                letter-spacing: 0.5em !important;
+                padding: 10px !important;
+            }
+            /* Hide the password reveal toggle to keep it clean */
+            div[data-baseweb="input"] button {
+                display: none !important;
+            }
+            </style>
+            """,
+            unsafe_allow_html=True
+        )
+        st.markdown("<h1 style='text-align: center; margin-top: 10vh;'>🎈 PopStock</h1>", unsafe_allow_html=True)
+        st.markdown("<h4 style='text-align: center; color: #888; font-weight: normal;'>Enter PIN to unlock</h4>", unsafe_allow_html=True)
+        
+        _, col, _ = st.columns([1, 2, 1])
+        with col:
+            st.text_input(
+                "PIN", 
+                type="password", 
+                on_change=password_entered, 
+                key="password", 
+                label_visibility="collapsed",
+                placeholder="••••"
+            )
+            
+            import streamlit.components.v1 as components
+            components.html(
+                """
+                <script>
+                // We use an interval to keep checking until Streamlit renders the input field
+                const interval = setInterval(() => {
+                    const pinInput = window.parent.document.querySelector('div[data-baseweb="input"] input[type="password"]');
+                    if (pinInput) {
+                        pinInput.setAttribute('inputmode', 'numeric');
+                        pinInput.setAttribute('pattern', '[0-9]*');
+                        clearInterval(interval);
+                    }
+                }, 100);
+                </script>
+                """,
+                height=0,
+                width=0
+            )
+            
+            if show_error:
+                st.error("😕 PIN incorrect")
+
+    if "password_correct" not in st.session_state:
+        # First run, show input for password.
+        render_login_ui(show_error=False)
+        return False
+    elif not st.session_state["password_correct"]:
+        # Password not correct, show input + error.
+        render_login_ui(show_error=True)
+        return False
+    else:
+        # Password correct.
+        return True
+
+if not check_password():
+    st.stop()  # Do not continue if check_password is not True.
+
+# Sidebar
+st.sidebar.title("🎈 PopStock")
+page = st.sidebar.radio("Go to", ["Inventory", "Scanner Hub", "Scan Shipment", "Add Manually", "Analytics", "Settings"])
+st.sidebar.markdown("---")
+
+# Auto-detect screen width to set view mode
+screen_width = streamlit_js_eval(js_expressions='window.innerWidth', key='SCR_WIDTH')
+
+# Default to Desktop if width is unknown (first load), otherwise use 768px threshold
+if screen_width is None or screen_width > 768:
+    view_mode = "💻 Desktop"
+else:
+    view_mode = "📱 Mobile"
+
+# For debugging or manual override, we can hide this or keep it disabled
+st.sidebar.markdown(f"*Auto-detected view: {view_mode}*")
+st.sidebar.markdown("---")
+st.sidebar.markdown("🛒 **[Open Supplier Site](https://bargainballoons.com)**")
+
+latex_thresholds = load_settings(file_mtime(SETTINGS_FILE))
+inventory = load_data(file_mtime(DB_FILE), file_mtime(LOG_FILE))
+
+# --- SHARED CARD RENDERERS ---
+# The latex and foil cards (desktop and mobile) share the same anatomy:
+# header + swatch, size grid, edit/delete popover. One copy of each block
+# lives here; the row fragments just wire them up with the right sizes,
+# status colors and widget key prefix.
+
+def card_title(row, is_foil):
+    """Human-readable card title ("Brand - Color" or "Color - Design")."""
+    return f"{row['color']} - {row['design']}" if is_foil else f"{row['brand']} - {row['color']}"
+
+
+def render_card_header(row, is_foil, mobile):
+    """Card title plus color swatch (circle for latex, square for foil)."""
+    radius = "10%" if is_foil else "50%"
+    if mobile:
+        if is_foil:
+            title_html = f"<strong>{row['color']} - {row['design']}</strong><br/><span style=\"font-size: 0.9em;\">({row['foil_type']})</span>"
+        else:
+            title_html = f"<strong>{row['brand']}</strong><br/><span style=\"font-size: 0.9em;\">{row['color']}</span>"
+        st.markdown(
+            f"""
+            <div class="header-row-marker" style="display: flex; align-items: center; gap: 10px; margin-top: 5px; padding-right: 40px;">
+                <div style="background-color:{row['hex']}; width:35px; height:35px; border-radius:{radius}; border: 1px solid #ddd; flex-shrink: 0;"></div>
+                <div style="line-height: 1.2;">{title_html}</div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+    else:
+        title = f"{card_title(row, is_foil)} ({row['foil_type']})" if is_foil else card_title(row, is_foil)
+        st.markdown(f"### {title}")
+
+
+def render_swatch(row, is_foil):
+    """Large desktop color swatch shown beside the size grid."""
+    radius = "10%" if is_foil else "50%"
+    st.markdown(f'<div style="background-color:{row["hex"]}; width:60px; height:60px; border-radius:{radius}; border: 2px solid #ddd;"></div>', unsafe_allow_html=True)
+
+
+def render_edit_popover(row, prefix, is_foil):
+    """⚙️ popover to edit the card's metadata or delete the item."""
+    mobile = prefix.startswith("m")
+    with st.popover("⚙️" if mobile else "⚙️ Edit / Delete"):
+        st.markdown(f"**Edit {card_title(row, is_foil)}**")
+        new_brand = st.text_input("Brand", value=row['brand'], key=f"{prefix}_edit_brand_{row['id']}")
+        new_color = st.text_input("Color Name", value=row['color'], key=f"{prefix}_edit_color_{row['id']}")
+        if is_foil:
+            new_design = st.text_input("Design", value=row['design'], key=f"{prefix}_edit_design_{row['id']}")
+            foil_types = ["Number", "Letter", "Shape"]
+            current_type_index = foil_types.index(row['foil_type']) if row['foil_type'] in foil_types else 0
+            new_foil_type = st.selectbox("Foil Type", foil_types, index=current_type_index, key=f"{prefix}_edit_type_{row['id']}")
+        new_hex = st.color_picker("Color Match", value=row['hex'], key=f"{prefix}_edit_hex_{row['id']}")
+
+        if st.button("Save Changes", key=f"{prefix}_save_{row['id']}", use_container_width=mobile):
+            row['brand'] = new_brand
+            row['color'] = new_color
+            if is_foil:
+                row['design'] = new_design
+                row['foil_type'] = new_foil_type
+            row['hex'] = new_hex
+            save_data(inventory)
+            st.rerun(scope="fragment")
+
+        st.divider()
+        if st.checkbox("Confirm Delete", key=f"{prefix}_confirm_delete_{row['id']}"):
+            if st.button("❌ Delete Permanently", type="primary", key=f"{prefix}_delete_{row['id']}", use_container_width=mobile):
+                del inventory[row['id']]
+                save_data(inventory)
+                st.rerun()
+
+
+def render_desktop_size_form(row, sizes, colors, prefix):
+    """Desktop size grid: one form per row, a single Save applies all deltas.
+
+    sizes is a list of (field, label) tuples; colors gives the status color
+    per size (indexed like sizes).
+    """
+    with st.form(f"{prefix}_form_{row['id']}"):
+        cols = st.columns(max(len(sizes), 3))
+        for i, (field, label) in enumerate(sizes):
+            qty_dict = row[field]
+            full_qty = qty_dict.get('full', 0)
+            open_qty = qty_dict.get('open', 0)
+
+            cols[i].markdown(f"**{label}**")
+            cols[i].markdown(f":{colors[i]}[**{full_qty} Full**] | **{open_qty} Open**")
+
+            cols[i].number_input("Full", min_value=0, value=int(full_qty), step=1, key=f"{prefix}_full_{row['id']}_{field}")
+            cols[i].number_input("Open", min_value=0, value=int(open_qty), step=1, key=f"{prefix}_open_{row['id']}_{field}")
+
+        if st.form_submit_button("💾 Save Row"):
+            for field, label in sizes:
+                old_full = row[field].get('full', 0)
+                old_open = row[field].get('open', 0)
+                new_full = st.session_state[f"{prefix}_full_{row['id']}_{field}"]
+                new_open = st.session_state[f"{prefix}_open_{row['id']}_{field}"]
+                # Usage means bags actually left the shelf: gate it on the
+                # net (full + open) drop, so Full -1 / Open +1 counts as
+                # opening a bag rather than consuming one
+                usage = max(0, (old_full + old_open) - (new_full + new_open))
+                if new_full != old_full:
+                    apply_mutation(inventory, {"id": row['id'], "field": field, "sub": "full", "delta": new_full - old_full, "usage": usage})
+                    usage = 0  # already counted on the full op
+                if new_open != old_open:
+                    apply_mutation(inventory, {"id": row['id'], "field": field, "sub": "open", "delta": new_open - old_open, "usage": usage})
+            st.rerun(scope="fragment")
+
+
+def render_mobile_size_grid(row, sizes, indicators, prefix):
+    """Mobile size table: status emoji plus full/open inputs that save on change."""
+    st.markdown("<hr style='margin: 10px 0; border: none; border-top: 1px solid #eee;'>", unsafe_allow_html=True)
+
+    st.markdown("""
+    <div style="display: flex; text-align: center; font-size: 0.8em; color: #888; margin-bottom: 5px;">
+        <div style="flex: 1.5;"></div>
+        <div style="flex: 2;">Full Bags</div>
+        <div style="flex: 2;">Open</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    for i, (field, label) in enumerate(sizes):
+        qty_dict = row[field]
+        full_qty = qty_dict.get('full', 0)
+        open_qty = qty_dict.get('open', 0)
+
+        c_lbl, c_full, c_open = st.columns([1.5, 2, 2])
+        with c_lbl:
+            st.markdown('<div class="mobile-table-row" style="display:none;"></div>', unsafe_allow_html=True)
+            st.markdown(f"{indicators[i]} **{label}**")
+
+        full_key = f"{prefix}_qty_full_{row['id']}_{field}"
+        open_key = f"{prefix}_qty_open_{row['id']}_{field}"
+
+        def on_full_change(e=row, fld=field, fk=full_key):
+            new_f = st.session_state[fk]
+            old_f = e[fld]['full']
+            if new_f == old_f:
+                return
+            usage = old_f - new_f if new_f < old_f else 0
+            apply_mutation(inventory, {"id": e['id'], "field": fld, "sub": "full", "delta": new_f - old_f, "usage": usage})
+
+        def on_open_change(e=row, fld=field, fk=full_key, ok=open_key, lbl=label):
+            new_o = st.session_state[ok]
+            old_o = e[fld]['open']
+            old_f = e[fld]['full']
+            if new_o > old_o:
+                if old_f > 0:
+                    apply_mutation(inventory, {"id": e['id'], "field": fld, "sub": "full", "delta": -1})
+                    apply_mutation(inventory, {"id": e['id'], "field": fld, "sub": "open", "delta": new_o - old_o})
+                    st.session_state[fk] = old_f - 1
+                else:
+                    st.session_state[ok] = old_o
+                    st.toast(f"No full bags of {lbl} to open!")
+            elif new_o < old_o:
+                apply_mutation(inventory, {"id": e['id'], "field": fld, "sub": "open", "delta": new_o - old_o})
+
+        with c_full:
+            st.number_input(
+                "f",
+                min_value=0,
+                value=int(full_qty),
+                step=1,
+                key=full_key,
+                on_change=on_full_change,
+                label_visibility="collapsed"
+            )
+        with c_open:
+            st.number_input(
+                "o",
+                min_value=0,
+                value=int(open_qty),
+                step=1,
+                key=open_key,
+                on_change=on_open_change,
+                label_visibility="collapsed"
+            )
+
+# --- PAGE: INVENTORY ---
+if page == "Inventory":
+    st.title("Current Inventory")
+    
+    if view_mode == "📱 Mobile":
+        st.markdown("""
+        <style>
+        /* 1. Target EXACTLY the stVerticalBlock container of the card, preventing bleeding to parent tabs */
+        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) {
+            position: relative !important;
+        }
+        /* 2. Float the entire layout wrapper containing the popover to top right */
+        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) > div[data-testid="stLayoutWrapper"]:has(div[data-testid="stPopover"]) {
+            position: absolute !important;
+            top: 10px !important;
+            right: 10px !important;
+            width: auto !important;
+            z-index: 10;
+        }
+        /* 3. Make the popover button a compact circle */
+        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button {
+            padding: 0 !important;
+            width: 38px !important;
+            height: 38px !important;
+            min-height: 0 !important;
+            border-radius: 50% !important;
+            line-height: 1 !important;
+            display: flex !important;
+            align-items: center !important;
+            justify-content: center !important;
+        }
+        /* 4. Hide the chevron icon container so the gear fits perfectly */
+        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button > div > div:last-child {
+            display: none !important;
+        }
+        /* 5. Force the inner button container and markdown to be perfectly centered */
+        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button > div > div:first-child {
+            display: flex !important;
+            align-items: center !important;
+            justify-content: center !important;
+            width: 100% !important;
+            height: 100% !important;
+        }
+        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button div[data-testid="stMarkdownContainer"] {
+            display: flex !important;
+            align-items: center !important;
+            justify-content: center !important;
+            width: 100% !important;
+            height: 100% !important;
+            margin: 0 !important;
+            padding: 0 !important;
+        }
+        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button p {
+            margin: 0 !important;
+            padding: 0 !important;
+            font-size: 1.2em !important;
+            display: flex !important;
+            align-items: center !important;
+            justify-content: center !important;
+        }
+        div[data-testid="stVerticalBlock"]:has(> div[data-testid="stElementContainer"] .header-row-marker) div[data-testid="stPopover"] button span {
+            margin: 0 !important;
+            padding: 0 !important;
+        }
+        /* Safely force table row columns to stay side-by-side on mobile without stacking */
+        div[data-testid="stHorizontalBlock"]:has(.mobile-table-row) {
+            display: flex !important;
+            flex-direction: row !important;
+            flex-wrap: nowrap !important;
+            align-items: center !important;
+            width: 100% !important;
+            gap: 5px !important;
+        }
+        div[data-testid="stHorizontalBlock"]:has(.mobile-table-row) > div[data-testid="stColumn"]:nth-child(1) {
+            flex: 1.5 1 0% !important;
+            width: auto !important;
+            min-width: 0 !important;
+        }
+        div[data-testid="stHorizontalBlock"]:has(.mobile-table-row) > div[data-testid="stColumn"]:nth-child(2) {
+            flex: 2 1 0% !important;
+            width: auto !important;
+            min-width: 0 !important;
+        }
+        div[data-testid="stHorizontalBlock"]:has(.mobile-table-row) > div[data-testid="stColumn"]:nth-child(3) {
+            flex: 2 1 0% !important;
+            width: auto !important;
+            min-width: 0 !important;
+        }
+        /* Make number inputs more compact */
+        input[type="number"] {
+            text-align: center !important;
+        }
+        </style>
+        """, unsafe_allow_html=True)
+        
+    # Precompute per-rerun invariants: one (low, medium) tuple per size,
+    # plus int16 threshold vectors for vectorized status classification
+    threshold_tuples = {s: (latex_thresholds[s]["low"], latex_thresholds[s]["medium"]) for s in LATEX_SIZES}
+    latex_low = np.array([threshold_tuples[s][0] for s in LATEX_SIZES], np.int16)
+    latex_med = np.array([threshold_tuples[s][1] for s in LATEX_SIZES], np.int16)
+
+    # TABS for Latex vs Foil, plus a grid view for bulk edits
+    tab_latex, tab_foil, tab_bulk = st.tabs(["🔵 Latex Balloons", "✨ Foil Balloons", "📝 Bulk Edit"])
+    
+    # --- TAB 1: LATEX ---
+    with tab_latex:
+        # Search Latex
+        search = st.text_input("🔍 Search Latex (Color)", "", key="search_latex")
+
+        # Filter for Latex (cached on file state + search)
+        latex_ids = filter_inventory_ids(file_mtime(DB_FILE), file_mtime(LOG_FILE), 'latex', search, None)
+        latex_items = [inventory[i] for i in latex_ids]
+
+        @st.fragment
+        def render_latex_row(row):
+            # A fragment reruns just this row's card on interaction instead of
+            # re-rendering every card on the page
+            # Classify all 5 sizes in one vectorized comparison
+            # (0 = low / 1 = medium / 2 = ok)
+            row_full = np.fromiter((row[s].get('full', 0) for s in LATEX_SIZES), np.int16, count=len(LATEX_SIZES))
+            row_status = np.where(row_full <= latex_low, 0, np.where(row_full <= latex_med, 1, 2))
+            sizes = [(s, s) for s in LATEX_SIZES]
+
+            if view_mode == "💻 Desktop":
+                with st.container():
+                    render_card_header(row, is_foil=False, mobile=False)
+                    c1, c2 = st.columns([1, 6])
+                    with c1:
+                        render_swatch(row, is_foil=False)
+                    with c2:
+                        colors = [("red", "orange", "green")[s] for s in row_status]
+                        render_desktop_size_form(row, sizes, colors, "d_l")
+
+                    render_edit_popover(row, "d_l", is_foil=False)
+                    st.divider()
+            else: # Mobile
+                with st.container(border=True):
+                    render_card_header(row, is_foil=False, mobile=True)
+                    render_edit_popover(row, "m_l", is_foil=False)
+
+                    indicators = [("🔴", "🟠", "🟢")[s] for s in row_status]
+                    render_mobile_size_grid(row, sizes, indicators, "m_l")
+
+        for row in latex_items:
+            render_latex_row(row)
+
+    # --- TAB 2: FOIL ---
+    with tab_foil:
+        # Search Foil
+        c_search, c_filter = st.columns([3, 1])
+        search_foil = c_search.text_input("🔍 Search Foils (e.g. 'Gold 1')", "", key="search_foil")
+        type_filter = c_filter.selectbox("Filter Type", ["All", "Number", "Letter", "Shape"])
+
+        # Filter + sort for Foil (cached on file state + filters)
+        foil_ids = filter_inventory_ids(file_mtime(DB_FILE), file_mtime(LOG_FILE), 'foil', search_foil, type_filter)
+        foil_items = [inventory[i] for i in foil_ids]
+
+        @st.fragment
+        def render_foil_row(row):
+            # Foils only flag empty vs in-stock (0 = low / 2 = ok)
+            foil_fields = ["small", "large"]
+            foil_status = [0 if row[f].get('full', 0) == 0 else 2 for f in foil_fields]
+
+            if view_mode == "💻 Desktop":
+                with st.container():
+                    render_card_header(row, is_foil=True, mobile=False)
+                    c1, c2 = st.columns([1, 6])
+                    with c1:
+                        render_swatch(row, is_foil=True)
+                    with c2:
+                        colors = [("red", "orange", "green")[s] for s in foil_status]
+                        render_desktop_size_form(row, [("small", "Small (16in/Air)"), ("large", "Large (40in/Helium)")], colors, "d_f")
+
+                    render_edit_popover(row, "d_f", is_foil=True)
+                    st.divider()
+            else: # Mobile
+                with st.container(border=True):
+                    render_card_header(row, is_foil=True, mobile=True)
+                    render_edit_popover(row, "m_f", is_foil=True)
+
+                    indicators = [("🔴", "🟠", "🟢")[s] for s in foil_status]
+                    render_mobile_size_grid(row, [("small", "Small (16in)"), ("large", "Large (40in)")], indicators, "m_f")
+
+        for row in foil_items:
+            render_foil_row(row)
+
+    # --- TAB 3: BULK EDIT ---
+    with tab_bulk:
+        # One virtualized grid instead of hundreds of per-cell widgets:
+        # edit full-bag counts for many rows, then apply everything at once.
+        st.caption("Edit full-bag counts in one grid and apply all changes together. Open bags are managed on the cards.")
+
+        def apply_grid_edits(edited, sizes):
+            """Diffs the edited grid against the inventory and journals the deltas."""
+            changes = 0
+            # itertuples is much cheaper than iterrows (no Series built per row);
+            # name=None because "5in" etc. are not valid attribute names
+            for item_id, *new_fulls in edited[sizes].itertuples(index=True, name=None):
+                entry = inventory[item_id]
+                for s, new_full in zip(sizes, new_fulls):
+                    if pd.isna(new_full):
+                        continue  # cleared cell — leave the stored count alone
+                    new_full = int(new_full)
+                    old_full = entry[s].get('full', 0)
+                    if new_full != old_full:
+                        usage = old_full - new_full if new_full < old_full else 0
+                        apply_mutation(inventory, {"id": item_id, "field": s, "sub": "full", "delta": new_full - old_full, "usage": usage})
+                        changes += 1
+            return changes
+
+        latex_rows = [e for e in inventory.values() if e['category'] == 'latex']
+        if latex_rows:
+            st.subheader("🔵 Latex")
+            bulk_latex = pd.DataFrame([
+                {"id": e['id'], "Brand": e['brand'], "Color": e['color'], **{s: e[s].get('full', 0) for s in LATEX_SIZES}}
+                for e in latex_rows
+            ]).set_index('id')
+            edited_latex = st.data_editor(
+                bulk_latex,
+                column_config={s: st.column_config.NumberColumn(min_value=0, step=1, required=True) for s in LATEX_SIZES},
+                disabled=["Brand", "Color"],
+                hide_index=True,
+                use_container_width=True,
+                key="latex_editor",
+            )
+            if st.button("Apply Latex Changes", key="apply_bulk_latex"):
+                changes = apply_grid_edits(edited_latex, LATEX_SIZES)
+                st.toast(f"Applied {changes} change(s)")
+                st.rerun()
+
+        foil_rows = [e for e in inventory.values() if e['category'] == 'foil']
+        if foil_rows:
+            st.subheader("✨ Foil")
+            foil_size_fields = ["small", "large"]
+            bulk_foil = pd.DataFrame([
+                {"id": e['id'], "Color": e['color'], "Design": e['design'], "Type": e['foil_type'], **{s: e[s].get('full', 0) for s in foil_size_fields}}
+                for e in foil_rows
+            ]).set_index('id')
+            edited_foil = st.data_editor(
+                bulk_foil,
+                column_config={s: st.column_config.NumberColumn(min_value=0, step=1, required=True) for s in foil_size_fields},
+                disabled=["Color", "Design", "Type"],
+                hide_index=True,
+                use_container_width=True,
+                key="foil_editor",
+            )
+            if st.button("Apply Foil Changes", key="apply_bulk_foil"):
+                changes = apply_grid_edits(edited_foil, foil_size_fields)
+                st.toast(f"Applied {changes} change(s)")
+                st.rerun()
+
+# --- PAGE: ADD MANUALLY ---
+elif page == "Add Manually":
+    st.title("➕ Add New Inventory")
+    
+    type_choice = st.radio("What are you adding?", ["🔵 Latex Balloon", "✨ Foil Balloon"], horizontal=True)
+    
+    with st.form("add_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            brand = st.text_input("Brand", "Tuftex")
+            color = st.text_input("Color Name", "Gold")
+            hex_code = st.color_picker("Color Match", "#D4AF37")
+            
+        with col2:
+            if type_choice == "🔵 Latex Balloon":
+                category = "latex"
+                foil_type = ""
+                design = ""
+                st.info(f"Creating a standard color family ({'/'.join(LATEX_SIZES)})")
+            else:
+                category = "foil"
+                foil_type = st.selectbox("Foil Type", ["Number", "Letter", "Shape"])
+                design = st.text_input("Design/Value (e.g. '1', 'A', 'Star')")
+                st.info("Creating a foil entry (Small/Large)")
+
+        submitted = st.form_submit_button("Create Entry")
+        
+        if submitted:
+            new_id = max(inventory) + 1 if inventory else 1
+            new_row = {
+                "id": new_id, 
+                "category": category,
+                "brand": brand, 
+                "color": color, 
+                "hex": hex_code,
+                "foil_type": foil_type,
+                "design": design,
+                "5in": {"full": 0, "open": 0}, "11in": {"full": 0, "open": 0}, "17in": {"full": 0, "open": 0}, "24in": {"full": 0, "open": 0}, "32in": {"full": 0, "open": 0}, # Latex fields
+                "small": {"full": 0, "open": 0}, "large": {"full": 0, "open": 0}, # Foil fields
+                "barcodes": {},
+                "monthly_usage": {}
+            }
+            inventory[new_id] = new_row
+            save_data(inventory)
+            st.success(f"Added {color} {design} to {category} list!")
+
+# --- PAGE: ANALYTICS ---
+elif page == "Analytics":
+    st.title("📊 Usage Trends")
+    st.markdown("Analyze balloon usage by month and compare year-over-year data.")
+    
+    if inventory:
+        # Materialize a DataFrame lazily — only this page needs one (for charting)
+        df = pd.DataFrame(list(inventory.values()))
+        # Low-cardinality strings as categoricals: equality tests run on int
+        # codes instead of object arrays, and repeated strings are stored once
+        for c in ('category', 'brand', 'color'):
+            df[c] = df[c].astype('category')
+
+        # --- Data Preparation ---
+        # Get all available year-month keys from the data (cached on DB mtime)
+        sorted_months = usage_months(file_mtime(DB_FILE), file_mtime(LOG_FILE))
+
+        if not sorted_months:
+            st.info("No usage data recorded yet. Start using balloons (clicking ➖) to see trends here.")
+        else:
+            # --- UI Filters ---
+            selected_month_str = st.selectbox("Select Month to Analyze", sorted_months)
+            
+            # --- Chart for Selected Month ---
+            st.header(f"Usage for {datetime.strptime(selected_month_str, '%Y-%m').strftime('%B %Y')}")
+            
+            # Create a dataframe for the chart
+            # Typed extraction in one pass instead of a per-row .apply lambda
+            df['current_month_usage'] = np.fromiter(
+                (d.get(selected_month_str, 0) if isinstance(d, dict) else 0 for d in df['monthly_usage'].values),
+                dtype=np.int32, count=len(df)
+            )
+            chart_df = df[df['current_month_usage'] > 0].copy()
+            chart_df = chart_df.sort_values(by='current_month_usage', ascending=False).head(15)
+            
+            if chart_df.empty:
+                st.write("No balloons were used in this month.")
+            else:
+                # "Color Design" for foils, plain color for latex — one np.where
+                # over the whole frame instead of an axis=1 apply lambda
+                colors = chart_df['color'].astype(str)
+                chart_df['Label'] = np.where(
+                    (chart_df['category'] == 'foil').to_numpy(),
+                    colors + ' ' + chart_df['design'].fillna('').astype(str),
+                    colors
+                )
+                st.bar_chart(chart_df.set_index('Label')['current_month_usage'])
+
+                # --- Year-over-Year Comparison ---
+                st.header("Year-over-Year Comparison")
+                try:
+                    current_date = datetime.strptime(selected_month_str, '%Y-%m')
+                    last_year_date = current_date.replace(year=current_date.year - 1)
+                    last_year_month_str = last_year_date.strftime('%Y-%m')
+
+                    if last_year_month_str in sorted_months:
+                        # Pull the month straight out of the dicts instead of a
+                        # per-row Series.apply lambda
+                        usage_dicts = df['monthly_usage'].to_numpy()
+                        last = np.fromiter(
+                            (d.get(last_year_month_str, 0) if isinstance(d, dict) else 0 for d in usage_dicts),
+                            dtype=np.int64, count=len(usage_dicts)
+                        )
+                        cur = df['current_month_usage'].to_numpy()
+
+                        # Filter on flat arrays, then build the display frame
+                        # directly — no column-subset copy of df. keep always
+                        # has a hit here: this branch only runs when the chart
+                        # found rows with current_month_usage > 0
+                        keep = (cur > 0) | (last > 0)
+                        cur, last = cur[keep], last[keep]
+                        comp_colors = df['color'].astype(str).to_numpy()[keep]
+                        comp_designs = df['design'].fillna('').astype(str).to_numpy()[keep]
+                        labels = np.where((df['category'] == 'foil').to_numpy()[keep], comp_colors + ' ' + comp_designs, comp_colors)
+
+                        st.write(f"Comparing {selected_month_str} with {last_year_month_str}")
+                        st.dataframe(pd.DataFrame({
+                            'Label': labels,
+                            f'Usage ({selected_month_str})': cur,
+                            f'Usage ({last_year_month_str})': last,
+                            'Change': cur - last,
+                        }).set_index('Label'))
+
+                    else:
+                        st.info(f"No data available for {last_year_month_str} to compare.")
+                except Exception as e:
+                    st.error(f"Could not perform year-over-year comparison: {e}")
+
+    else:
+        st.info("No inventory data found.")
+
+# --- PAGE: SETTINGS ---
+elif page == "Settings":
+    st.title("⚙️ Settings")
+    st.header("Latex Stock Thresholds")
+    st.write("Set the bag count at which stock is considered 'Low' (red) or 'Medium' (orange).")
+
+    # Seed the widget state once from the saved settings; after that the
+    # widgets own their values via st.session_state, so no thresholds dict
+    # needs reassembling on every rerun
+    for size in LATEX_SIZES:
+        st.session_state.setdefault(f"low_{size}", latex_thresholds[size]["low"])
+        st.session_state.setdefault(f"medium_{size}", latex_thresholds[size]["medium"])
+
+    for size in LATEX_SIZES:
+        st.subheader(f"{size} Balloons")
+        col1, col2 = st.columns(2)
+        col1.number_input(
+            "Low Stock Threshold (<=)",
+            min_value=0,
+            key=f"low_{size}"
+        )
+        col2.number_input(
+            "Medium Stock Threshold (<=)",
+            min_value=st.session_state[f"low_{size}"],
+            key=f"medium_{size}"
+        )
+
+    if st.button("Save Settings"):
+        # Only assemble the dict when actually saving
+        save_settings({
+            size: {"low": st.session_state[f"low_{size}"], "medium": st.session_state[f"medium_{size}"]}
+            for size in LATEX_SIZES
+        })
+        st.success("Settings saved successfully!")
+        st.rerun()
+
+# --- PAGE: SCANNER HUB ---
+elif page == "Scanner Hub":
+    st.title("🎯 Scanner Hub")
+    
+    st.markdown("""
+    <style>
+    /* Make the radio buttons huge for easy tapping */
+    div.row-widget.stRadio > div{
+        flex-direction:row;
+        align-items: stretch;
+    }
+    div.row-widget.stRadio > div > label {
+        padding: 20px !important;
+        background-color: #f0f2f6;
+        border-radius: 10px;
+        margin-right: 10px;
+        text-align: center;
+        flex: 1;
+        cursor: pointer;
+    }
+    div.row-widget.stRadio > div > label[data-checked="true"] {
+        background-color: #4CAF50;
+        color: white;
+    }
+    /* Hide the actual radio circle */
+    div.row-widget.stRadio > div > label > div:first-child {
+        display: none;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+    
+    # Initialize session state for manual link
+    if "unknown_barcode" not in st.session_state:
+        st.session_state.unknown_barcode = None
+
+    # Scanner Modes
+    mode = st.radio(
+        "Select Action", 
+        ["🔵 RECEIVING\n(Add Full)", "🟡 OPENING\n(Full ➔ Open)", "🔴 TRASHING\n(Use Open)"],
+        label_visibility="collapsed"
+    )
+    
+    st.divider()
+
+    # If we have an unknown barcode, show the linking UI
+    if st.session_state.unknown_barcode:
+        st.warning(f"Barcode **{st.session_state.unknown_barcode}** not recognized!")
+        st.write("Please link this barcode to an existing item:")
+        
+        with st.form("link_barcode_form"):
+            # Create a selection list of all items and sizes
+            item_options = []
+            for row in inventory.values():
+                label_base = f"{row['brand']} - {row['color']}" if row['category'] == 'latex' else f"{row['color']} {row['design']} ({row['foil_type']})"
+                sizes = LATEX_SIZES if row['category'] == 'latex' else ["small", "large"]
+                for size in sizes:
+                    item_options.append({"label": f"{label_base} - {size}", "id": row['id'], "size": size})
+            
+            selected_item_label = st.selectbox("Select Item", [opt["label"] for opt in item_options])
+            
+            c1, c2 = st.columns(2)
+            with c1:
+                if st.form_submit_button("🔗 Link & Process", type="primary", use_container_width=True):
+                    # Find the selected item details
+                    selected_opt = next(opt for opt in item_options if opt["label"] == selected_item_label)
+                    item_id = selected_opt["id"]
+                    item_size = selected_opt["size"]
+                    
+                    # Update database
+                    entry = inventory[item_id]
+
+                    # Ensure barcodes dict exists and the size list exists
+                    if not isinstance(entry.get('barcodes'), dict):
+                        entry['barcodes'] = {}
+
+                    barcodes_dict = entry['barcodes']
+                    if item_size not in barcodes_dict:
+                        barcodes_dict[item_size] = []
+
+                    barcodes_dict[item_size].append(st.session_state.unknown_barcode)
+
+                    # Also process the scan based on current mode!
+                    qty_dict = entry[item_size]
+                    if mode.startswith("🔵"): # Receiving
+                        qty_dict['full'] += 1
+                        action_msg = f"Added 1 Full bag to {selected_item_label}"
+                    elif mode.startswith("🟡"): # Opening
+                        if qty_dict['full'] > 0:
+                            qty_dict['full'] -= 1
+                            qty_dict['open'] += 1
+                            action_msg = f"Opened 1 bag of {selected_item_label}"
+                        else:
+                            action_msg = f"Cannot open: No full bags of {selected_item_label} in stock."
+                    else: # Trashing
+                        if qty_dict['open'] > 0:
+                            qty_dict['open'] -= 1
+                            action_msg = f"Trashed 1 open bag of {selected_item_label}"
+                        elif qty_dict['full'] > 0:
+                            qty_dict['full'] -= 1
+                            action_msg = f"Trashed 1 full bag of {selected_item_label}"
+                        else:
+                            action_msg = f"Cannot trash: No stock of {selected_item_label}."
+                            
+                        # Log usage
+                        usage_dict = entry['monthly_usage']
+                        usage_dict[CURRENT_MONTH_STR] = usage_dict.get(CURRENT_MONTH_STR, 0) + 1
+
+                    save_data(inventory)
+                    
+                    st.session_state.unknown_barcode = None
+                    st.toast(action_msg)
+                    st.rerun()
+            with c2:
+                if st.form_submit_button("Cancel", use_container_width=True):
+                    st.session_state.unknown_barcode = None
+                    st.rerun()
+
+    else:
+        # Standard Scanning UI
+        def handle_scan():
+            scanned_code = st.session_state.barcode_input.strip()
+            if not scanned_code:
+                return
+                
+            # Search for barcode
+            found = False
+            for row in inventory.values():
+                barcodes_dict = row.get('barcodes', {})
+                if not isinstance(barcodes_dict, dict): continue
+                
+                for size, code_list in barcodes_dict.items():
+                    if scanned_code in code_list:
+                        # FOUND IT!
+                        found = True
+                        label_base = f"{row['brand']} - {row['color']}" if row['category'] == 'latex' else f"{row['color']} {row['design']} ({row['foil_type']})"
+                        item_label = f"{label_base} - {size}"
+                        
+                        qty_dict = row[size]
+                        item_id = row['id']
+
+                        if mode.startswith("🔵"): # Receiving
+                            apply_mutation(inventory, {"id": item_id, "field": size, "sub": "full", "delta": 1})
+                            action_msg = f"✅ Added 1 Full bag to {item_label}"
+                        elif mode.startswith("🟡"): # Opening
+                            if qty_dict['full'] > 0:
+                                apply_mutation(inventory, {"id": item_id, "field": size, "sub": "full", "delta": -1})
+                                apply_mutation(inventory, {"id": item_id, "field": size, "sub": "open", "delta": 1})
+                                action_msg = f"✅ Opened 1 bag of {item_label}"
+                            else:
+                                action_msg = f"❌ Cannot open: No full bags of {item_label} in stock."
+                        else: # Trashing
+                            if qty_dict['open'] > 0:
+                                apply_mutation(inventory, {"id": item_id, "field": size, "sub": "open", "delta": -1, "usage": 1})
+                                action_msg = f"🗑️ Trashed 1 open bag of {item_label}"
+                            elif qty_dict['full'] > 0:
+                                apply_mutation(inventory, {"id": item_id, "field": size, "sub": "full", "delta": -1, "usage": 1})
+                                action_msg = f"🗑️ Trashed 1 full bag of {item_label}"
+                            else:
+                                action_msg = f"❌ Cannot trash: No stock of {item_label}."
+
+                        st.toast(action_msg)
+                        break
+                if found:
+                    break
+            
+            if not found:
+                st.session_state.unknown_barcode = scanned_code
+                
+            # Clear input for next scan
+            st.session_state.barcode_input = ""
+
+        # The actual input field
+        st.text_input(
+            "Scan Barcode Here", 
+            key="barcode_input", 
+            on_change=handle_scan,
+            help="Ensure this box is selected before pulling the scanner trigger."
+        )
+        st.info("💡 Keep the text box above selected. When the scanner beeps, it will automatically process and clear itself for the next scan.")
+
+# --- PAGE: SCAN SHIPMENT ---
+elif page == "Scan Shipment":
+    st.title("📷 Scan New Shipment")
+    st.write("Upload a photo of the balloon bags. The AI will identify them and update your inventory.")
+
+    img_files = st.file_uploader("Upload Images", type=["jpg", "jpeg", "png"], accept_multiple_files=True)
+
+    if img_files:
+        preview_cols = st.columns(min(len(img_files), 4))
+        for i, img_file in enumerate(img_files):
+            preview_cols[i % len(preview_cols)].image(img_file, caption=img_file.name, width=250)
+
+        if st.button("Analyze Images"):
+            # Check for the API key in Streamlit secrets
+            if "API_KEY" not in st.secrets or not st.secrets["API_KEY"]:
+                st.error("Gemini API Key not found. Please add it to your Streamlit secrets.")
+                st.info("You can get a free API key from Google AI Studio and add it to the secrets of this app.")
+                st.stop()
+
+            # One batched API call for the whole shipment
+            with st.spinner('🤖 AI is scanning...'):
+                try:
+                    detected_items = analyze_images_with_gemini(tuple(f.getvalue() for f in img_files))
+                except Exception as e:
+                    st.error(f"AI Error: {e}")
+                    detected_items = []
+
+            if detected_items:
+                st.success(f"AI Found {len(detected_items)} item(s)!")
+                st.subheader("Processing Results:")
+                
+                updated_count = 0
+                # A set from the start: repeated detections of the same unknown
+                # SKU dedupe as they arrive instead of at render time
+                new_item_warnings = set()
+
+                # Group detections first so ten bags of the same SKU become one
+                # inventory lookup and one += 10 instead of ten separate passes
+                detected_counts = Counter()
+                for item in detected_items:
+                    category = item.get('category')
+
+                    if category == 'latex':
+                        size = item.get('size')
+                        if size not in LATEX_SIZES:
+                            st.warning(f"Skipping '{item.get('color', 'Unknown')}' - AI returned unknown size '{size}'.")
+                            continue
+                        detected_counts[('latex', item.get('brand', 'Unknown'), item.get('color', 'Unknown'), '', size)] += 1
+
+                    elif category == 'foil':
+                        size_field = "large" if item.get('size') == "large" else "small"
+                        detected_counts[('foil', item.get('brand', 'Unknown'), item.get('color', 'Unknown'), item.get('design', 'Unknown'), size_field)] += 1
+
+                # Index entries by lowered match key so each SKU is one hash
+                # lookup instead of a scan over the inventory (latex uses ''
+                # for design, matching the Counter key above)
+                entry_index = {
+                    (e['category'], e['brand'].lower(), e['color'].lower(), e['design'].lower() if e['category'] == 'foil' else ''): e
+                    for e in inventory.values()
+                }
+
+                # Collect result lines and render them as one element after the
+                # loop instead of one st.write round trip per SKU
+                result_lines = []
+                for (category, brand, color, design, size), count in detected_counts.items():
+                    # Case-insensitive matching
+                    match = entry_index.get((category, brand.lower(), color.lower(), design.lower()))
+                    if category == 'latex':
+                        if match is not None:
+                            match[size]['full'] += count
+                            result_lines.append(f"✅ Added {count} bag(s) to **{match['brand']} {match['color']} ({size})**.")
+                            updated_count += count
+                        else:
+                            new_item_warnings.add(f"Latex: **{brand} {color}**. Please add it via 'Add Manually'.")
+
+                    else:
+                        if match is not None:
+                            match[size]['full'] += count
+                            result_lines.append(f"✅ Added {count} to **{match['color']} {match['design']} ({size})**.")
+                            updated_count += count
+                        else:
+                            new_item_warnings.add(f"Foil: **{brand} {color} {design}**. Please add it via 'Add Manually'.")
+
+                if result_lines:
+                    st.markdown('\n'.join(f"- {line}" for line in result_lines))
+
+                if updated_count > 0:
+                    save_data(inventory)
+                    st.toast(f"Successfully updated {updated_count} inventory item(s)!")
+                
+                if new_item_warnings:
+                    st.warning("Some items are new and could not be added automatically:")
+                    for warning in new_item_warnings:
+                        st.markdown(f"- {warning}")
+            else:
+                st.warning("The AI could not detect any balloon bags in the image. Please try another photo.")